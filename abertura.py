@@ -0,0 +1,200 @@
+"""Livro de aberturas: lances pré-calculados para os primeiros plies da partida.
+
+O livro é construído offline expandindo a partir da posição inicial os
+melhores lances de buscas profundas (a IA jogando contra si mesma, com
+alternativas próximas do melhor score) e gravado em JSON, indexado pelo
+hash Zobrist da posição (que já inclui o lado a jogar).
+
+Uso:
+    python abertura.py gerar --plies 8 --depth 6 --saida livro.json
+    python abertura.py consultar livro.json
+"""
+import argparse
+import json
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from regras import DamasRules, BRANCO, Movimento
+from ia import DamasAI
+
+VERSAO = 1
+PLIES_PADRAO = 8
+PROFUNDIDADE_PADRAO = 6
+# Lances até MARGEM_PADRAO pontos abaixo do melhor entram no livro, com peso decrescente.
+MARGEM_PADRAO = 30
+ALTERNATIVAS_PADRAO = 2
+
+
+def _chave(zobrist: int) -> str:
+    return f"{zobrist:016x}"
+
+
+def _lance_para_json(move: Movimento) -> dict:
+    return {
+        'start': list(move.start),
+        'end': list(move.end),
+        'path': [list(p) for p in move.path],
+        'captures': [list(p) for p in move.captures],
+    }
+
+
+def _lance_de_json(dados: dict) -> Movimento:
+    return Movimento(
+        tuple(dados['start']),
+        tuple(dados['end']),
+        tuple(tuple(p) for p in dados['path']),
+        tuple(tuple(p) for p in dados['captures']),
+    )
+
+
+class LivroAberturas:
+    """Livro carregado em memória: hash Zobrist -> (lances, pesos)."""
+
+    def __init__(self, caminho: str, seed: Optional[int] = None):
+        self.caminho = caminho
+        with open(caminho, encoding='utf-8') as f:
+            dados = json.load(f)
+        if dados.get('versao') != VERSAO:
+            raise ValueError(f"{caminho}: versão de livro não suportada ({dados.get('versao')}).")
+        self.plies = dados['plies']
+        self.profundidade = dados['profundidade']
+        self._posicoes: Dict[int, Tuple[List[Movimento], List[int]]] = {}
+        for chave, entradas in dados['posicoes'].items():
+            moves = [_lance_de_json(e) for e in entradas]
+            pesos = [e['peso'] for e in entradas]
+            self._posicoes[int(chave, 16)] = (moves, pesos)
+        self._rng = random.Random(seed)
+        self.consultas = 0
+        self.acertos = 0
+
+    def __len__(self):
+        return len(self._posicoes)
+
+    def lances(self, board, player) -> Optional[Tuple[List[Movimento], List[int]]]:
+        return self._posicoes.get(DamasRules.zobrist_hash(board, player))
+
+    def escolher(self, board, player) -> Optional[Movimento]:
+        """Sorteia um lance do livro proporcionalmente aos pesos, ou None fora do livro."""
+        self.consultas += 1
+        entrada = self.lances(board, player)
+        if entrada is None:
+            return None
+        moves, pesos = entrada
+        move = moves[0] if len(moves) == 1 else self._rng.choices(moves, weights=pesos)[0]
+        # Proteção barata contra colisão de hash: a peça de origem tem que ser de quem joga.
+        if board[move.start[0]][move.start[1]] * player <= 0 or board[move.end[0]][move.end[1]] != 0:
+            return None
+        self.acertos += 1
+        return move
+
+
+def avaliar_lances(ai: DamasAI, board, player, depth) -> List[Tuple[int, Movimento]]:
+    """Score (ponto de vista de `player`) de cada lance legal, com busca de profundidade `depth`."""
+    ai.nodes_evaluated = 0
+    if ai.tt:
+        ai.tt.nova_busca()
+    ai._new_search_ordering()
+    board = [row[:] for row in board]
+    zobrist = DamasRules.zobrist_hash(board, player)
+
+    resultado = []
+    for move in DamasRules.get_valid_moves(board, player):
+        undo = DamasRules.make_move(board, move)
+        # O filho fica a um ply da raiz: vale para a tablebase e para os limites de extensão.
+        ai.current_depth = depth
+        ai._root_move = None
+        score = -ai.negamax(board, depth - 1, -math.inf, math.inf, -player,
+                            DamasRules.zobrist_update(zobrist, undo), ply=1)[0]
+        DamasRules.unmake_move(board, undo)
+        resultado.append((score, move))
+    resultado.sort(key=lambda item: -item[0])
+    return resultado
+
+
+def gerar(plies=PLIES_PADRAO, depth=PROFUNDIDADE_PADRAO, margem=MARGEM_PADRAO,
+          alternativas=ALTERNATIVAS_PADRAO, caminho='livro.json', verbose=True) -> dict:
+    """Constrói o livro em largura a partir da posição inicial.
+
+    Em cada posição entram o melhor lance e até `alternativas - 1` outros a no
+    máximo `margem` pontos dele; as posições resultantes são expandidas até
+    `plies`. Transposições são avaliadas uma única vez.
+    """
+    ai = DamasAI(depth=depth, verbose=False)
+    posicoes = {}
+    fronteira = [(DamasRules.criar_tabuleiro(), BRANCO)]
+    inicio = time.perf_counter()
+
+    for ply in range(plies):
+        proxima = []
+        for board, player in fronteira:
+            chave = _chave(DamasRules.zobrist_hash(board, player))
+            if chave in posicoes:
+                continue
+            avaliados = avaliar_lances(ai, board, player, depth)
+            if not avaliados:
+                continue
+            melhor = avaliados[0][0]
+            escolhidos = [(score, move) for score, move in avaliados[:alternativas] if melhor - score <= margem]
+            entradas = []
+            for score, move in escolhidos:
+                entrada = _lance_para_json(move)
+                entrada['peso'] = margem + 1 - (melhor - score)
+                entrada['score'] = score
+                entradas.append(entrada)
+                proxima.append((DamasRules.apply_move(board, move), -player))
+            posicoes[chave] = entradas
+        fronteira = proxima
+        if verbose:
+            print(f"ply {ply + 1}/{plies}: {len(posicoes)} posições no livro "
+                  f"({time.perf_counter() - inicio:.1f}s)")
+
+    dados = {
+        'versao': VERSAO,
+        'plies': plies,
+        'profundidade': depth,
+        'margem': margem,
+        'posicoes': posicoes,
+    }
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, separators=(',', ':'))
+    return dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Livro de aberturas de Damas.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_gerar = sub.add_parser('gerar', help="Constrói o livro com buscas profundas a partir da posição inicial.")
+    p_gerar.add_argument('--plies', type=int, default=PLIES_PADRAO)
+    p_gerar.add_argument('--depth', type=int, default=PROFUNDIDADE_PADRAO)
+    p_gerar.add_argument('--margem', type=int, default=MARGEM_PADRAO,
+                         help="Diferença máxima de score para um lance alternativo entrar no livro.")
+    p_gerar.add_argument('--alternativas', type=int, default=ALTERNATIVAS_PADRAO,
+                         help="Máximo de lances guardados por posição.")
+    p_gerar.add_argument('--saida', default='livro.json')
+
+    p_info = sub.add_parser('consultar', help="Resumo de um livro e tempo médio de consulta.")
+    p_info.add_argument('arquivo')
+
+    args = parser.parse_args()
+    if args.comando == 'gerar':
+        gerar(args.plies, args.depth, args.margem, args.alternativas, args.saida)
+        print(f"Gravado em {args.saida}.")
+    else:
+        livro = LivroAberturas(args.arquivo)
+        print(f"{len(livro)} posições, {livro.plies} plies, profundidade {livro.profundidade}.")
+        board = DamasRules.criar_tabuleiro()
+        moves, pesos = livro.lances(board, BRANCO) or ([], [])
+        for move, peso in zip(moves, pesos):
+            print(f"  {move.start} -> {move.end}: peso {peso}")
+        repeticoes = 10000
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            livro.escolher(board, BRANCO)
+        print(f"Consulta: {(time.perf_counter() - inicio) / repeticoes * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
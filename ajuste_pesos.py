@@ -0,0 +1,244 @@
+"""Ajuste automático dos pesos da avaliação (método Texel) a partir de partidas.
+
+A avaliação de DamasAI é linear nos pesos: para as brancas,
+    score = pedra * (pedras B - pedras V) + dama * (damas B - damas V)
+          + defesa_base * (pedras na própria base, B - V)
+          + soma das casas de tabuleiro[r][c] * (peça B em (r, c) - peça V em (r, c)).
+O ajuste minimiza o erro quadrático entre sigmoid(K * score) e o resultado
+final da partida (1, 0.5, 0 para as brancas) sobre posições quietas (sem
+captura disponível), com descida de gradiente em minilotes (Adam).
+
+Duas etapas, ambas em fluxo (memória limitada a um lote):
+    python ajuste_pesos.py extrair jogos.jsonl --saida posicoes.bin
+    python ajuste_pesos.py ajustar posicoes.bin --epocas 20 --saida pesos.json
+
+As partidas vêm de torneio.py. O arquivo de pesos é lido por
+DamasAI(pesos='pesos.json').
+
+Os termos extras de termos_avaliacao.py (mobilidade, peças presas etc.) não entram.
+"""
+import argparse
+import json
+import math
+import struct
+import time
+
+from regras import DamasRules, BRANCO
+from bitboard import SQ_PARA_RC, NUM_CASAS
+from ia import PESOS_PADRAO
+
+# Registro binário por posição: resultado (-1, 0, 1 para as brancas) + peça em cada casa escura.
+REGISTRO = struct.Struct(f'<b{NUM_CASAS}b')
+PLIES_IGNORADOS_PADRAO = 8
+
+# Parâmetros na ordem do vetor: pedra, dama, defesa_base e o peso de cada casa escura.
+NOMES_BASE = ('pedra', 'dama', 'defesa_base')
+NUM_PARAMETROS = len(NOMES_BASE) + NUM_CASAS
+LN10_400 = math.log(10) / 400
+
+
+def _partidas(caminhos):
+    for caminho in caminhos:
+        with open(caminho, encoding='utf-8') as f:
+            for linha in f:
+                if linha.strip():
+                    yield json.loads(linha)
+
+
+def posicoes_da_partida(partida, plies_ignorados=PLIES_IGNORADOS_PADRAO):
+    """Reproduz a partida e gera as casas escuras de cada posição quieta após `plies_ignorados`."""
+    board = DamasRules.criar_tabuleiro()
+    player = BRANCO
+    for ply, i in enumerate(partida['abertura'] + partida['lances']):
+        moves = DamasRules.get_valid_moves(board, player)
+        if ply >= plies_ignorados and not moves[0].captures:
+            yield tuple(board[r][c] for r, c in SQ_PARA_RC)
+        board = DamasRules.apply_move(board, moves[i])
+        player = -player
+
+
+def extrair(caminhos, saida, plies_ignorados=PLIES_IGNORADOS_PADRAO):
+    """Converte partidas (JSONL) em registros binários de tamanho fixo, uma partida por vez."""
+    partidas = posicoes = 0
+    with open(saida, 'wb') as f:
+        for partida in _partidas(caminhos):
+            resultado = partida['resultado']
+            for casas in posicoes_da_partida(partida, plies_ignorados):
+                f.write(REGISTRO.pack(resultado, *casas))
+                posicoes += 1
+            partidas += 1
+    return partidas, posicoes
+
+
+def ler_lotes(caminho, tamanho_lote):
+    """Gera lotes de (resultado, casas) lendo o arquivo aos pedaços."""
+    with open(caminho, 'rb') as f:
+        while True:
+            dados = f.read(REGISTRO.size * tamanho_lote)
+            if not dados:
+                return
+            yield [(r[0], r[1:]) for r in REGISTRO.iter_unpack(dados)]
+
+
+def caracteristicas(casas):
+    """Vetor esparso [(índice do parâmetro, coeficiente)] tal que score das brancas = soma(theta[i] * coef)."""
+    pedras = damas = base = 0
+    feats = []
+    for sq, piece in enumerate(casas):
+        if piece == 0:
+            continue
+        sinal = 1 if piece > 0 else -1
+        if abs(piece) == 2:
+            damas += sinal
+        else:
+            pedras += sinal
+            r = SQ_PARA_RC[sq][0]
+            if (piece == 1 and r == 0) or (piece == -1 and r == 7):
+                base += sinal
+        feats.append((len(NOMES_BASE) + sq, sinal))
+    return [(0, pedras), (1, damas), (2, base)] + feats
+
+
+def vetor_de_pesos(pesos):
+    pesos = {**PESOS_PADRAO, **pesos}
+    return [float(pesos[nome]) for nome in NOMES_BASE] + [float(pesos['tabuleiro'][r][c]) for r, c in SQ_PARA_RC]
+
+
+def pesos_de_vetor(theta):
+    pesos = {nome: round(theta[i]) for i, nome in enumerate(NOMES_BASE)}
+    tabuleiro = [[0] * 8 for _ in range(8)]
+    for sq, (r, c) in enumerate(SQ_PARA_RC):
+        tabuleiro[r][c] = round(theta[len(NOMES_BASE) + sq])
+    pesos['tabuleiro'] = tabuleiro
+    return pesos
+
+
+def _sigmoid(x):
+    if x < -500:
+        return 0.0
+    if x > 500:
+        return 1.0
+    return 1 / (1 + math.exp(-x))
+
+
+def erro_medio(caminho, theta, k, tamanho_lote=8192, limite=None):
+    total = n = 0
+    for lote in ler_lotes(caminho, tamanho_lote):
+        for resultado, casas in lote:
+            score = sum(theta[i] * coef for i, coef in caracteristicas(casas))
+            alvo = (resultado + 1) / 2
+            total += (alvo - _sigmoid(k * LN10_400 * score)) ** 2
+            n += 1
+        if limite and n >= limite:
+            break
+    return total / n if n else 0.0
+
+
+def ajustar_k(caminho, theta, amostra=200000):
+    """Escala K do sigmoid que melhor explica os resultados com os pesos atuais (busca por seção áurea)."""
+    # Os scores não dependem de K: calculados uma vez para a amostra.
+    pares = []
+    for lote in ler_lotes(caminho, 8192):
+        for resultado, casas in lote:
+            pares.append(((resultado + 1) / 2, sum(theta[i] * coef for i, coef in caracteristicas(casas))))
+        if len(pares) >= amostra:
+            break
+
+    def erro(k):
+        return sum((alvo - _sigmoid(k * LN10_400 * score)) ** 2 for alvo, score in pares) / len(pares)
+
+    a, b = 0.05, 5.0
+    razao = (math.sqrt(5) - 1) / 2
+    for _ in range(20):
+        c, d = b - razao * (b - a), a + razao * (b - a)
+        if erro(c) < erro(d):
+            b = d
+        else:
+            a = c
+    return (a + b) / 2
+
+
+def ajustar(caminho, pesos_iniciais=None, epocas=10, tamanho_lote=4096, taxa=1.0,
+            regularizacao=1e-6, k=None, verbose=True):
+    """Adam em minilotes; a regularização puxa os pesos para os iniciais.
+
+    Ela é necessária porque material e tabuleiro não são independentes: somar
+    d a todas as casas e tirar d de pedra e dama dá a mesma avaliação.
+    """
+    theta = vetor_de_pesos(pesos_iniciais or {})
+    inicial = theta[:]
+    if k is None:
+        k = ajustar_k(caminho, theta)
+    if verbose:
+        print(f"K = {k:.3f}, erro inicial = {erro_medio(caminho, theta, k):.6f}")
+
+    m = [0.0] * NUM_PARAMETROS
+    v = [0.0] * NUM_PARAMETROS
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    passo = 0
+    escala = k * LN10_400
+    for epoca in range(epocas):
+        inicio = time.perf_counter()
+        for lote in ler_lotes(caminho, tamanho_lote):
+            grad = [0.0] * NUM_PARAMETROS
+            for resultado, casas in lote:
+                feats = caracteristicas(casas)
+                score = sum(theta[i] * coef for i, coef in feats)
+                p = _sigmoid(escala * score)
+                # d/dtheta (alvo - p)^2 = -2 (alvo - p) p (1 - p) escala * coef
+                fator = -2 * ((resultado + 1) / 2 - p) * p * (1 - p) * escala
+                for i, coef in feats:
+                    grad[i] += fator * coef
+            passo += 1
+            n = len(lote)
+            for i in range(NUM_PARAMETROS):
+                g = grad[i] / n + 2 * regularizacao * (theta[i] - inicial[i])
+                m[i] = beta1 * m[i] + (1 - beta1) * g
+                v[i] = beta2 * v[i] + (1 - beta2) * g * g
+                m_hat = m[i] / (1 - beta1 ** passo)
+                v_hat = v[i] / (1 - beta2 ** passo)
+                theta[i] -= taxa * m_hat / (math.sqrt(v_hat) + eps)
+        if verbose:
+            print(f"época {epoca + 1}/{epocas}: erro = {erro_medio(caminho, theta, k):.6f} "
+                  f"({time.perf_counter() - inicio:.1f}s)")
+    return pesos_de_vetor(theta), k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajuste dos pesos da avaliação pelo método Texel.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_extrair = sub.add_parser('extrair', help="Extrai posições quietas rotuladas de partidas do torneio.py.")
+    p_extrair.add_argument('partidas', nargs='+', help="Arquivos JSONL gerados por torneio.py.")
+    p_extrair.add_argument('--saida', default='posicoes.bin')
+    p_extrair.add_argument('--plies-ignorados', type=int, default=PLIES_IGNORADOS_PADRAO)
+
+    p_ajustar = sub.add_parser('ajustar', help="Ajusta os pesos sobre um arquivo de posições.")
+    p_ajustar.add_argument('posicoes')
+    p_ajustar.add_argument('--pesos-iniciais', help="JSON de pesos de partida (padrão: os de ia.py).")
+    p_ajustar.add_argument('--epocas', type=int, default=10)
+    p_ajustar.add_argument('--lote', type=int, default=4096)
+    p_ajustar.add_argument('--taxa', type=float, default=1.0)
+    p_ajustar.add_argument('--regularizacao', type=float, default=1e-6)
+    p_ajustar.add_argument('--k', type=float, help="Escala do sigmoid (padrão: ajustada aos dados).")
+    p_ajustar.add_argument('--saida', default='pesos.json')
+
+    args = parser.parse_args()
+    if args.comando == 'extrair':
+        partidas, posicoes = extrair(args.partidas, args.saida, args.plies_ignorados)
+        print(f"{posicoes} posições de {partidas} partidas gravadas em {args.saida}.")
+        return
+
+    pesos_iniciais = None
+    if args.pesos_iniciais:
+        with open(args.pesos_iniciais, encoding='utf-8') as f:
+            pesos_iniciais = json.load(f)
+    pesos, k = ajustar(args.posicoes, pesos_iniciais, args.epocas, args.lote, args.taxa, args.regularizacao, args.k)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(pesos, f, indent=2)
+    print(f"Pesos gravados em {args.saida}: pedra {pesos['pedra']}, dama {pesos['dama']}, "
+          f"defesa_base {pesos['defesa_base']}.")
+
+
+if __name__ == "__main__":
+    main()
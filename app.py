@@ -1,14 +1,25 @@
 import tkinter as tk
-from tkinter import messagebox, Menu
-from regras import DamasRules, BRANCO, VERMELHO
+from tkinter import filedialog, messagebox, Menu
+from regras import DamasRules, CacheLances, BRANCO, VERMELHO
 from ia import DamasAI
+from abertura import LivroAberturas
+from pdn import PartidaPDN, exportar
+import os
+import queue
 import sys
+import threading
+from datetime import date
 
 COR_CASA_CLARA = "#F0D9B5"
 COR_CASA_ESCURA = "#B58863"
 COR_PECA_BRANCA = "#FFFFFF"
 COR_PECA_VERMELHA = "#FF4444"
 COR_DESTINO = "#AAFF00"
+INTERVALO_POLLING_IA_MS = 100
+ARQUIVO_TABLEBASE = "tablebase.bin"
+ARQUIVO_LIVRO = "livro.json"
+ARQUIVO_PESOS = "pesos.json"
+CACHE_LANCES_INTERFACE = 64
 
 class DamasApp:
     def __init__(self, root):
@@ -25,7 +36,19 @@ class DamasApp:
         # Criação do Menu
         self.create_menu()
 
-        self.ai = DamasAI(depth=4)
+        # Usa a tablebase de finais se ela já tiver sido gerada (python tablebase.py gerar).
+        tablebase = ARQUIVO_TABLEBASE if os.path.exists(ARQUIVO_TABLEBASE) else None
+        livro = LivroAberturas(ARQUIVO_LIVRO) if os.path.exists(ARQUIVO_LIVRO) else None
+        pesos = ARQUIVO_PESOS if os.path.exists(ARQUIVO_PESOS) else None
+        self.ai = DamasAI(depth=4, tablebase=tablebase, livro=livro, pesos=pesos)
+        # A busca roda numa thread; o resultado volta pela fila e é lido via root.after.
+        self.ai_thread = None
+        self.ai_stop_event = None
+        self.ai_results = queue.Queue()
+        self.ai_search_id = 0
+        # Cliques seguidos na mesma posição não geram os lances de novo (a IA tem o seu cache,
+        # usado na thread da busca).
+        self.cache_lances = CacheLances(CACHE_LANCES_INTERFACE)
         self.reset_game()
 
         self.canvas = tk.Canvas(root, width=512, height=512)
@@ -44,13 +67,16 @@ class DamasApp:
         file_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Opções", menu=file_menu)
         file_menu.add_command(label="Jogar Novamente", command=self.reset_game)
+        file_menu.add_command(label="Salvar Partida (PDN)...", command=self.save_game)
         file_menu.add_separator()
         file_menu.add_command(label="Sair", command=self.root.quit)
 
     def reset_game(self):
         """Reinicia todas as variáveis de estado do jogo."""
+        self.cancel_ai_search()
         self.board = DamasRules.criar_tabuleiro()
         self.turn = BRANCO
+        self.move_history = []
         self.selected_piece = None
         self.valid_moves_for_selected = []
         
@@ -58,6 +84,24 @@ class DamasApp:
             self.status_label.config(text="Sua vez (Brancas)")
             self.draw_board()
 
+    def save_game(self):
+        """Grava os lances desta partida num arquivo PDN."""
+        caminho = filedialog.asksaveasfilename(
+            defaultextension=".pdn", filetypes=[("Portable Draughts Notation", "*.pdn")]
+        )
+        if not caminho:
+            return
+        resultado = None
+        if not DamasRules.has_any_move(self.board, self.turn):
+            resultado = -self.turn
+        partida = PartidaPDN(
+            {'Event': 'DamasApp', 'Date': date.today().strftime('%Y.%m.%d'), 'White': 'Humano', 'Black': 'IA'},
+            lances=self.move_history,
+            resultado=resultado,
+        )
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(exportar(partida))
+
     def draw_board(self):
         self.canvas.delete("all")
         CELL_SIZE = 64
@@ -117,7 +161,7 @@ class DamasApp:
             return
 
         if self.board[r][c] > 0: 
-            all_valid_moves = DamasRules.get_valid_moves(self.board, self.turn)
+            all_valid_moves = self.cache_lances.get_valid_moves(self.board, self.turn)
             my_moves = [m for m in all_valid_moves if m['start'] == (r, c)]
             
             if not my_moves and all_valid_moves:
@@ -135,6 +179,7 @@ class DamasApp:
 
     def execute_move(self, move):
         self.board = DamasRules.apply_move(self.board, move)
+        self.move_history.append(move)
         self.selected_piece = None
         self.valid_moves_for_selected = []
         self.turn = VERMELHO 
@@ -144,11 +189,56 @@ class DamasApp:
         
         self.root.after(200, self.ai_turn)
 
+    def cancel_ai_search(self):
+        """Interrompe a busca em andamento; um resultado atrasado é descartado pelo id."""
+        self.ai_search_id += 1
+        if self.ai_stop_event is not None:
+            self.ai_stop_event.set()
+
     def ai_turn(self):
-        best_move = self.ai.get_best_move(self.board, VERMELHO)
-        
+        if self.turn != VERMELHO:
+            return
+        if self.ai_thread is not None and self.ai_thread.is_alive():
+            if not self.ai_stop_event.is_set():
+                return
+            # Uma busca cancelada termina em poucos milissegundos; espera antes de reutilizar a IA.
+            self.ai_thread.join()
+
+        self.ai_search_id += 1
+        search_id = self.ai_search_id
+        stop_event = threading.Event()
+        self.ai_stop_event = stop_event
+        board = self.board
+
+        def search():
+            move = self.ai.get_best_move(board, VERMELHO, stop_event=stop_event)
+            self.ai_results.put((search_id, move))
+
+        self.ai_thread = threading.Thread(target=search, daemon=True)
+        self.ai_thread.start()
+        self.root.after(INTERVALO_POLLING_IA_MS, self.poll_ai, search_id)
+
+    def poll_ai(self, search_id):
+        if search_id != self.ai_search_id:
+            return
+        while True:
+            try:
+                result_id, best_move = self.ai_results.get_nowait()
+            except queue.Empty:
+                break
+            if result_id == search_id:
+                self.finish_ai_turn(best_move)
+                return
+
+        self.status_label.config(
+            text=f"IA Pensando... profundidade {self.ai.current_depth}, {self.ai.nodes_evaluated} posições"
+        )
+        self.root.after(INTERVALO_POLLING_IA_MS, self.poll_ai, search_id)
+
+    def finish_ai_turn(self, best_move):
         if best_move:
             self.board = DamasRules.apply_move(self.board, best_move)
+            self.move_history.append(best_move)
             self.turn = BRANCO
             self.status_label.config(text="Sua vez (Brancas)")
             self.draw_board()
@@ -159,7 +249,7 @@ class DamasApp:
                 self.root.quit()
                 return
 
-        if not DamasRules.get_valid_moves(self.board, BRANCO):
+        if not DamasRules.has_any_move(self.board, BRANCO):
              if messagebox.askyesno("Fim de Jogo", "Você não tem movimentos. A IA venceu!\nJogar novamente?"):
                  self.reset_game()
              else:
@@ -0,0 +1,147 @@
+"""Avaliação em lote de posições, para análises offline e ajuste de pesos.
+
+Calcula o mesmo score de DamasAI.evaluate (material + BOARD_WEIGHTS + defesa
+da base) para muitas posições de uma vez. Com NumPy instalado a conta é
+vetorizada; sem ele, cai num laço em Python puro com as mesmas tabelas, de
+modo que o projeto continua sem dependências obrigatórias.
+
+Uso:
+    python avaliacao_lote.py --posicoes 100000
+"""
+import argparse
+import random
+import time
+
+from regras import DamasRules, TABULEIRO_TAM, BRANCO
+from bitboard import SQ_PARA_RC, NUM_CASAS
+from ia import DamasAI, PESOS_PADRAO, tabela_avaliacao
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+# Peças indexadas por piece + 2: dama vermelha, pedra vermelha, vazio, pedra branca, dama branca.
+PECAS = (-2, -1, 0, 1, 2)
+
+
+def tabela_casas(pesos=None):
+    """tabela[piece + 2][r][c]: contribuição da peça na casa, do ponto de vista das brancas."""
+    por_casa = tabela_avaliacao({**PESOS_PADRAO, **(pesos or {})})
+    return [
+        [[por_casa[r][c].get(piece, 0) for c in range(TABULEIRO_TAM)] for r in range(TABULEIRO_TAM)]
+        for piece in PECAS
+    ]
+
+
+def _tabela_numpy(pesos):
+    return np.array(tabela_casas(pesos), dtype=np.int32)
+
+
+def avaliar_lote(boards, player_color=BRANCO, pesos=None):
+    """Scores de uma sequência de tabuleiros para `player_color` (um valor ou um por posição).
+
+    `boards` pode ser um array (N, 8, 8) de inteiros ou uma lista de
+    tabuleiros List[List[int]]. Com NumPy devolve um array int32; sem, uma
+    lista de int. O resultado é idêntico a DamasAI(pesos=pesos).evaluate.
+    """
+    if np is not None:
+        boards = np.asarray(boards, dtype=np.int8).reshape(-1, TABULEIRO_TAM, TABULEIRO_TAM)
+        tabela = _tabela_numpy(pesos)
+        linhas = np.arange(TABULEIRO_TAM)[:, None]
+        colunas = np.arange(TABULEIRO_TAM)[None, :]
+        brancas = tabela[boards.astype(np.intp) + 2, linhas, colunas].sum(axis=(1, 2))
+        return brancas * np.asarray(player_color, dtype=np.int32)
+
+    tabela = tabela_casas(pesos)
+    cores = player_color if isinstance(player_color, (list, tuple)) else None
+    scores = []
+    for i, board in enumerate(boards):
+        score = 0
+        for r, row in enumerate(board):
+            for c, piece in enumerate(row):
+                if piece:
+                    score += tabela[piece + 2][r][c]
+        scores.append(score * (cores[i] if cores is not None else player_color))
+    return scores
+
+
+def avaliar_bitboards(brancas, vermelhas, damas, player_color=BRANCO, pesos=None):
+    """Mesmo que avaliar_lote, para posições em máscaras de 32 bits (ver bitboard.DamasBitboard).
+
+    `brancas`, `vermelhas` e `damas` são sequências de mesmo tamanho N.
+    """
+    tabela = tabela_casas(pesos)
+    # tabela_sq[piece + 2][sq], na numeração de casas escuras do bitboard.
+    tabela_sq = [[tabela[p][r][c] for r, c in SQ_PARA_RC] for p in range(len(PECAS))]
+
+    if np is not None:
+        t = np.array(tabela_sq, dtype=np.int32)
+        deslocamentos = np.arange(NUM_CASAS, dtype=np.uint32)
+
+        def bits(masks):
+            return (np.asarray(masks, dtype=np.uint32)[:, None] >> deslocamentos) & 1
+
+        b, v, d = bits(brancas), bits(vermelhas), bits(damas)
+        brancas_score = (
+            (b & ~d & 1) @ t[3] + (b & d) @ t[4]
+            + (v & ~d & 1) @ t[1] + (v & d) @ t[0]
+        )
+        return brancas_score.astype(np.int32) * np.asarray(player_color, dtype=np.int32)
+
+    cores = player_color if isinstance(player_color, (list, tuple)) else None
+    scores = []
+    for i, (mb, mv, md) in enumerate(zip(brancas, vermelhas, damas)):
+        score = 0
+        for sq in range(NUM_CASAS):
+            bit = 1 << sq
+            if mb & bit:
+                score += tabela_sq[4 if md & bit else 3][sq]
+            elif mv & bit:
+                score += tabela_sq[0 if md & bit else 1][sq]
+        scores.append(score * (cores[i] if cores is not None else player_color))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara avaliação em lote com DamasAI.evaluate.")
+    parser.add_argument('--posicoes', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    boards, cores = [], []
+    board, player = DamasRules.criar_tabuleiro(), BRANCO
+    while len(boards) < args.posicoes:
+        moves = DamasRules.get_valid_moves(board, player)
+        if not moves:
+            board, player = DamasRules.criar_tabuleiro(), BRANCO
+            continue
+        board = DamasRules.apply_move(board, rng.choice(moves))
+        player = -player
+        boards.append(board)
+        cores.append(player)
+
+    ai = DamasAI(verbose=False)
+    inicio = time.perf_counter()
+    esperado = [ai.evaluate(b, p) for b, p in zip(boards, cores)]
+    t_laco = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = avaliar_lote(boards, list(cores))
+    t_lote = time.perf_counter() - inicio
+
+    iguais = all(int(x) == y for x, y in zip(obtido, esperado))
+    modo = "NumPy" if np is not None else "Python puro"
+    print(f"{len(boards)} posições | evaluate: {t_laco:.3f}s | lote ({modo}): {t_lote:.3f}s | "
+          f"idênticos: {'sim' if iguais else 'NÃO'}")
+    if np is not None:
+        # Sem a conversão das listas: o caso de quem já guarda as posições num array.
+        array, cores_array = np.array(boards, dtype=np.int8), np.array(cores, dtype=np.int32)
+        inicio = time.perf_counter()
+        avaliar_lote(array, cores_array)
+        print(f"lote a partir de array (N, 8, 8) int8: {time.perf_counter() - inicio:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
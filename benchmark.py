@@ -0,0 +1,679 @@
+"""Benchmarks do motor de regras e da IA, sem interface gráfica.
+
+Uso:
+    python benchmark.py suite --saida resultado.json [--comparar base.json]
+    python benchmark.py ordenacao --depth 6
+    python benchmark.py pvs --depth 6
+    python benchmark.py seletiva --depths 6 8
+    python benchmark.py cache --depth 8
+    python benchmark.py perfil --depth 6
+    python benchmark.py termos --posicoes 2000
+    python benchmark.py paralelo --depth 7 --workers 1 2 4 8
+    python benchmark.py capturas
+    python benchmark.py variantes --depth 4
+    python benchmark.py movimentos
+    python benchmark.py bitboard --depth 5
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from regras import DamasRules, BRANCO, VERMELHO, DAMA_BRANCO, DAMA_VERMELHO
+from bitboard import DamasBitboard
+from ia import DamasAI
+from termos_avaliacao import TERMOS
+
+PECAS_DIAGRAMA = {'.': 0, 'b': 1, 'B': 2, 'v': -1, 'V': -2}
+
+
+def tabuleiro_de_diagrama(linhas):
+    """Converte 8 strings (linha 7 no topo, como na tela) em tabuleiro List[List[int]].
+
+    'b'/'B' = pedra/dama branca, 'v'/'V' = pedra/dama vermelha, '.' = vazio.
+    """
+    if len(linhas) != 8 or any(len(linha) != 8 for linha in linhas):
+        raise ValueError("O diagrama deve ter 8 linhas de 8 caracteres.")
+    board = [[0] * 8 for _ in range(8)]
+    for i, linha in enumerate(linhas):
+        r = 7 - i
+        for c, ch in enumerate(linha):
+            piece = PECAS_DIAGRAMA[ch]
+            if piece and (r + c) % 2 == 0:
+                raise ValueError(f"Peça em casa clara: linha {r}, coluna {c}.")
+            board[r][c] = piece
+    return board
+
+
+# Posições fixas: (tabuleiro, jogador da vez).
+POSICOES = {
+    'inicial': (DamasRules.criar_tabuleiro(), BRANCO),
+    'meio_jogo_1': (tabuleiro_de_diagrama([
+        'v.v.v.v.',
+        '.v.v.v.v',
+        'v.......',
+        '.......v',
+        'b...b.b.',
+        '.....b.b',
+        'b.......',
+        '.b.b.b.b',
+    ]), VERMELHO),
+    'meio_jogo_2': (tabuleiro_de_diagrama([
+        'v.v.v.v.',
+        '.v...v.v',
+        'v...v.v.',
+        '.....v..',
+        'b.......',
+        '.b.b...b',
+        'b.b...b.',
+        '.b.V.b.b',
+    ]), BRANCO),
+    'meio_jogo_3': (tabuleiro_de_diagrama([
+        'v.v...v.',
+        '.v.v....',
+        'v.......',
+        '........',
+        '..b.....',
+        '.....b..',
+        'b.b.....',
+        '.....b.b',
+    ]), VERMELHO),
+    'final_damas_1': (tabuleiro_de_diagrama([
+        'V.......',
+        '........',
+        '....V...',
+        '.v......',
+        '........',
+        '...B....',
+        '..b...B.',
+        '.......B',
+    ]), BRANCO),
+    'final_damas_2': (tabuleiro_de_diagrama([
+        '..B.....',
+        '.....V..',
+        '........',
+        '...v.V..',
+        '........',
+        '.b...b..',
+        '....B...',
+        '........',
+    ]), VERMELHO),
+}
+
+# Damas voadoras diante de várias peças: muitas sequências de captura possíveis.
+POSICOES_CAPTURAS = {
+    'capturas_damas_1': (tabuleiro_de_diagrama([
+        '........',
+        '.....v..',
+        '..v.v...',
+        '........',
+        '..v.v.v.',
+        '.v......',
+        '....v.v.',
+        '.....B.B',
+    ]), BRANCO),
+    'capturas_damas_2': (tabuleiro_de_diagrama([
+        'B...B...',
+        '.v......',
+        '....v.v.',
+        '.v......',
+        '....v...',
+        '...v....',
+        '..v.v...',
+        '........',
+    ]), BRANCO),
+    'capturas_damas_3': (tabuleiro_de_diagrama([
+        '....B...',
+        '.v.v....',
+        'B.....v.',
+        '.v.v....',
+        '........',
+        '.v.v.v..',
+        '........',
+        '........',
+    ]), BRANCO),
+}
+
+
+def bench_ordenacao(depth):
+    print(f"{'posição':<16}{'ordenação':>10}{'nós':>12}{'tempo (s)':>12}")
+    totais = {False: [0, 0.0], True: [0, 0.0]}
+    for nome, (board, player) in POSICOES.items():
+        for ordenar in (False, True):
+            ai = DamasAI(depth=depth, move_ordering=ordenar, verbose=False)
+            inicio = time.perf_counter()
+            ai.get_best_move(board, player)
+            tempo = time.perf_counter() - inicio
+            totais[ordenar][0] += ai.nodes_evaluated
+            totais[ordenar][1] += tempo
+            print(f"{nome:<16}{'sim' if ordenar else 'não':>10}{ai.nodes_evaluated:>12}{tempo:>12.3f}")
+    for ordenar in (False, True):
+        nos, tempo = totais[ordenar]
+        print(f"{'TOTAL':<16}{'sim' if ordenar else 'não':>10}{nos:>12}{tempo:>12.3f}")
+
+
+BUSCAS_PVS = {
+    'alfa-beta': {'pvs': False, 'aspiracao': False},
+    'aspiração': {'pvs': False, 'aspiracao': True},
+    'pvs': {'pvs': True, 'aspiracao': False},
+    'pvs+aspiração': {'pvs': True, 'aspiracao': True},
+}
+
+
+def bench_pvs(depth, quantidade):
+    """Nós com alpha-beta puro, PVS e janelas de aspiração, em profundidade fixa e no
+    aprofundamento iterativo até `depth` (onde a aspiração tem o score anterior).
+
+    Além de POSICOES, usa `quantidade` posições de partidas aleatórias: o conjunto
+    curado sozinho é pequeno demais para decidir os padrões.
+    """
+    posicoes = list(POSICOES.values()) + _posicoes_sorteadas(quantidade)
+    print(f"{len(posicoes)} posições")
+    print(f"{'busca':<16}{'modo':>10}{'nós':>10}{'rebuscas':>10}{'falhas asp.':>13}{'tempo (s)':>11}{'mesmo score':>13}")
+    referencia = {}
+    for nome_busca, opcoes in BUSCAS_PVS.items():
+        for modo in ('fixa', 'iterativa'):
+            nos = rebuscas = falhas = iguais = 0
+            inicio = time.perf_counter()
+            for indice, (board, player) in enumerate(posicoes):
+                ai = DamasAI(depth=depth, verbose=False, **opcoes)
+                if modo == 'fixa':
+                    ai.get_best_move(board, player)
+                else:
+                    ai.iterative_deepening([row[:] for row in board], player,
+                                           DamasRules.zobrist_hash(board, player), None, depth)
+                e = ai.estatisticas
+                nos += e.nos
+                rebuscas += e.rebuscas_pvs
+                falhas += e.falhas_aspiracao
+                iguais += referencia.setdefault((modo, indice), e.score) == e.score
+            tempo = time.perf_counter() - inicio
+            print(f"{nome_busca:<16}{modo:>10}{nos:>10}{rebuscas:>10}{falhas:>13}{tempo:>11.3f}"
+                  f"{iguais:>7}/{len(posicoes)}")
+
+
+SELETIVAS = {
+    'nenhuma': {},
+    'lmr': {'lmr': True},
+    'futilidade': {'futilidade': True},
+    'extensoes': {'extensoes': True},
+    'todas': {'lmr': True, 'futilidade': True, 'extensoes': True},
+}
+
+
+def bench_seletiva(depths, referencia_depth):
+    """Nós, tempo e concordância de lance com a busca completa para cada recurso de busca seletiva.
+
+    O tempo da busca completa em `referencia_depth` é a base da coluna 'x ref.'.
+    """
+    completa = {}
+    inicio = time.perf_counter()
+    for nome, (board, player) in POSICOES.items():
+        DamasAI(depth=referencia_depth, verbose=False).get_best_move(board, player)
+    tempo_referencia = time.perf_counter() - inicio
+    print(f"busca completa em depth {referencia_depth}: {tempo_referencia:.3f}s")
+    print(f"{'seletiva':<12}{'depth':>6}{'nós':>10}{'tempo (s)':>11}{'x ref.':>8}{'mesmo lance':>13}")
+    for depth in depths:
+        for nome_sel, opcoes in SELETIVAS.items():
+            nos = iguais = 0
+            inicio = time.perf_counter()
+            for nome, (board, player) in POSICOES.items():
+                ai = DamasAI(depth=depth, verbose=False, **opcoes)
+                move = ai.get_best_move(board, player)
+                nos += ai.estatisticas.nos
+                iguais += completa.setdefault((depth, nome), move) == move
+            tempo = time.perf_counter() - inicio
+            print(f"{nome_sel:<12}{depth:>6}{nos:>10}{tempo:>11.3f}{tempo / tempo_referencia:>8.2f}"
+                  f"{iguais:>7}/{len(POSICOES)}")
+
+
+def bench_cache_lances(depth, capacidades):
+    """Taxa de acerto e tempo do cache de lances (aprofundamento iterativo até `depth`) por capacidade."""
+    print(f"{'capacidade':>10}{'hits':>10}{'misses':>10}{'acerto':>9}{'tempo (s)':>11}")
+    for capacidade in [0] + capacidades:
+        hits = misses = 0
+        inicio = time.perf_counter()
+        for board, player in POSICOES.values():
+            ai = DamasAI(depth=depth, verbose=False, cache_lances=capacidade)
+            ai.iterative_deepening([row[:] for row in board], player,
+                                   DamasRules.zobrist_hash(board, player), None, depth)
+            if ai.cache_lances is not None:
+                hits += ai.cache_lances.hits
+                misses += ai.cache_lances.misses
+        tempo = time.perf_counter() - inicio
+        acerto = hits / (hits + misses) if hits + misses else 0.0
+        print(f"{capacidade:>10}{hits:>10}{misses:>10}{acerto:>9.1%}{tempo:>11.3f}")
+
+
+def bench_perfil(depth):
+    """Onde vai o tempo da busca: contadores e tempos de EstatisticasBusca por posição."""
+    print(f"{'posição':<16}{'nós':>9}{'quiesc.':>9}{'1º corte':>10}{'ramif.':>8}"
+          f"{'geração':>10}{'ordenação':>11}{'avaliação':>11}{'total (s)':>11}")
+    for nome, (board, player) in POSICOES.items():
+        ai = DamasAI(depth=depth, verbose=False, perfilar=True)
+        ai.get_best_move(board, player)
+        e = ai.estatisticas
+        print(f"{nome:<16}{e.nos:>9}{e.nos_quiescencia:>9}{e.taxa_corte_primeiro_lance:>10.1%}"
+              f"{e.ramificacao_efetiva:>8.2f}{e.tempo_geracao / e.tempo_total:>10.1%}"
+              f"{e.tempo_ordenacao / e.tempo_total:>11.1%}{e.tempo_avaliacao / e.tempo_total:>11.1%}"
+              f"{e.tempo_total:>11.3f}")
+
+
+def _posicoes_sorteadas(quantidade, seed=1):
+    """Posições de partidas aleatórias a partir das de POSICOES, para medir a avaliação."""
+    rng = random.Random(seed)
+    posicoes = []
+    while len(posicoes) < quantidade:
+        board, player = rng.choice(list(POSICOES.values()))
+        for _ in range(rng.randrange(30)):
+            moves = DamasRules.get_valid_moves(board, player)
+            if not moves:
+                break
+            board = DamasRules.apply_move(board, rng.choice(moves))
+            player = -player
+        posicoes.append((board, player))
+    return posicoes
+
+
+def bench_termos(quantidade, depth):
+    """Custo de cada termo extra da avaliação: avaliações por segundo e tempo de uma busca fixa."""
+    posicoes = _posicoes_sorteadas(quantidade)
+    print(f"{'termos':<16}{'aval./s':>12}{'custo':>9}{'nós':>10}{'busca (s)':>11}")
+    base = None
+    for termos in [()] + [(t,) for t in TERMOS] + [TERMOS]:
+        ai = DamasAI(depth=depth, verbose=False, termos=termos)
+        inicio = time.perf_counter()
+        for board, player in posicoes:
+            ai.evaluate(board, player)
+        por_segundo = len(posicoes) / (time.perf_counter() - inicio)
+        base = base or por_segundo
+        nos = 0
+        inicio = time.perf_counter()
+        for board, player in POSICOES.values():
+            ai.nova_partida()
+            ai.get_best_move(board, player)
+            nos += ai.nodes_evaluated
+        tempo = time.perf_counter() - inicio
+        rotulo = 'todos' if termos == TERMOS else (termos[0] if termos else 'nenhum')
+        print(f"{rotulo:<16}{por_segundo:>12.0f}{base / por_segundo:>8.2f}x{nos:>10}{tempo:>11.3f}")
+
+
+def bench_paralelo(depth, workers_list, tt_tamanho):
+    """Tempo total da busca na raiz dividida entre processos, comparado ao serial."""
+    serial = {}
+    ai = DamasAI(depth=depth, tt_tamanho=tt_tamanho, verbose=False)
+    inicio = time.perf_counter()
+    for nome, (board, player) in POSICOES.items():
+        ai.nova_partida()
+        serial[nome] = ai.get_best_move(board, player)
+    tempo_serial = time.perf_counter() - inicio
+    print(f"{'workers':>8}{'tempo (s)':>12}{'speedup':>10}{'mesmo lance':>14}")
+    print(f"{'serial':>8}{tempo_serial:>12.3f}{1.0:>10.2f}{len(serial):>8}/{len(serial)}")
+
+    for workers in workers_list:
+        ai = DamasAI(depth=depth, tt_tamanho=tt_tamanho, verbose=False, workers=workers)
+        try:
+            # Aquece o pool para não medir a criação dos processos.
+            ai.get_best_move(*POSICOES['inicial'])
+            iguais = 0
+            inicio = time.perf_counter()
+            for nome, (board, player) in POSICOES.items():
+                ai.nova_partida()
+                iguais += ai.get_best_move(board, player) == serial[nome]
+            tempo = time.perf_counter() - inicio
+        finally:
+            ai.close()
+        print(f"{workers:>8}{tempo:>12.3f}{tempo_serial / tempo:>10.2f}{iguais:>8}/{len(serial)}")
+
+
+def bench_capturas(repeticoes):
+    """Tempo de DamasRules.get_valid_moves em posições ricas em capturas de dama, comparado aos
+    atalhos get_capture_moves (quiescência) e has_any_move (teste de fim de jogo)."""
+    print(f"{'posição':<20}{'lances':>8}{'capturas':>10}{'µs/chamada':>14}{'só capturas':>13}{'tem lance':>11}")
+    for nome, (board, player) in {**POSICOES_CAPTURAS, **POSICOES}.items():
+        moves = DamasRules.get_valid_moves(board, player)
+        tempos = []
+        for funcao in (DamasRules.get_valid_moves, DamasRules.get_capture_moves, DamasRules.has_any_move):
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                funcao(board, player)
+            tempos.append((time.perf_counter() - inicio) / repeticoes * 1e6)
+        capturas = len(moves[0].captures) if moves else 0
+        print(f"{nome:<20}{len(moves):>8}{capturas:>10}{tempos[0]:>14.1f}{tempos[1]:>13.1f}{tempos[2]:>11.1f}")
+
+
+def _finais_de_damas(quantidade, seed=3):
+    """Finais sorteados: 1-3 damas brancas (e até 2 pedras) contra 3-7 peças vermelhas, brancas a jogar."""
+    rng = random.Random(seed)
+    escuras = [(r, c) for r in range(8) for c in range(8) if (r + c) % 2 == 1]
+    posicoes = []
+    while len(posicoes) < quantidade:
+        board = [[0] * 8 for _ in range(8)]
+        casas = rng.sample(escuras, 12)
+        pecas = [DAMA_BRANCO] * rng.randint(1, 3) + [BRANCO] * rng.randint(0, 2)
+        pecas += [rng.choice((VERMELHO, VERMELHO, DAMA_VERMELHO)) for _ in range(rng.randint(3, 7))]
+        for (r, c), piece in zip(casas, pecas):
+            if (piece == BRANCO and r == 7) or (piece == VERMELHO and r == 0):
+                piece *= 2
+            board[r][c] = piece
+        if DamasRules.has_any_move(board, BRANCO):
+            posicoes.append((board, BRANCO))
+    return posicoes
+
+
+def bench_variantes(quantidade, depth):
+    """Quanto a fusão de capturas equivalentes encolhe a árvore em finais de damas: lances por
+    posição e perft com e sem variantes, e a ramificação da busca (que só vê lances canônicos)."""
+    posicoes = list(POSICOES_CAPTURAS.values()) + _finais_de_damas(quantidade)
+    lances = [0, 0]
+    folhas = [0, 0]
+    for board, player in posicoes:
+        for i, variantes in enumerate((True, False)):
+            lances[i] += len(DamasRules.get_valid_moves(board, player, variantes))
+            folhas[i] += perft(board, player, depth, variantes)
+    n = len(posicoes)
+    print(f"{n} finais de damas")
+    print(f"lances por posição: {lances[0] / n:.2f} com variantes, {lances[1] / n:.2f} canônicos "
+          f"({1 - lances[1] / lances[0]:.1%} a menos)")
+    print(f"perft {depth}: {folhas[0]} com variantes, {folhas[1]} canônicos "
+          f"(ramificação {(folhas[0] / n) ** (1 / depth):.2f} -> {(folhas[1] / n) ** (1 / depth):.2f} por ply)")
+    nos = expandidos = gerados = buscados = 0
+    for board, player in posicoes:
+        ai = DamasAI(depth=depth, verbose=False)
+        ai.get_best_move(board, player)
+        e = ai.estatisticas
+        nos += e.nos
+        expandidos += e.nos_expandidos
+        gerados += e.lances_gerados
+        buscados += e.lances_buscados
+    print(f"busca depth {depth}: {nos} nós, ramificação média {gerados / expandidos:.2f}, "
+          f"efetiva {buscados / expandidos:.2f}")
+
+
+def _bytes_alocados(fabrica):
+    tracemalloc.start()
+    try:
+        resultado = fabrica()
+        atual, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return atual, resultado
+
+
+def _casa_nova(pos):
+    return (pos[0], pos[1])
+
+
+def _como_dict(move):
+    """Lance no formato antigo (dicionário com listas), com tuplas novas como o gerador antigo criava."""
+    return {
+        'start': _casa_nova(move.start),
+        'end': _casa_nova(move.end),
+        'path': [_casa_nova(pos) for pos in move.path],
+        'captures': [_casa_nova(pos) for pos in move.captures],
+    }
+
+
+def bench_movimentos(repeticoes):
+    """Memória por lance gerado (Movimento x dicionário equivalente) e tempo de geração."""
+    posicoes = list({**POSICOES, **POSICOES_CAPTURAS}.values())
+    bytes_mov, listas = _bytes_alocados(
+        lambda: [DamasRules.get_valid_moves(board, player) for board, player in posicoes]
+    )
+    total = sum(len(moves) for moves in listas)
+    bytes_dict, _ = _bytes_alocados(lambda: [[_como_dict(m) for m in moves] for moves in listas])
+
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for board, player in posicoes:
+            DamasRules.get_valid_moves(board, player)
+    tempo = (time.perf_counter() - inicio) / (repeticoes * total)
+
+    print(f"lances gerados:            {total}")
+    print(f"bytes por lance (Movimento): {bytes_mov / total:.0f}")
+    print(f"bytes por lance (dict):      {bytes_dict / total:.0f}")
+    print(f"µs por lance gerado:         {tempo * 1e6:.2f}")
+
+
+def perft(board, player, depth, variantes=False):
+    """Número de folhas da árvore de lances legais até `depth` (tabuleiro restaurado ao final).
+
+    Conta capturas equivalentes uma vez só, como a contagem padrão; `variantes` conta cada caminho.
+    """
+    if depth == 0:
+        return 1
+    moves = DamasRules.get_valid_moves(board, player, variantes)
+    if depth == 1:
+        return len(moves)
+    total = 0
+    for move in moves:
+        undo = DamasRules.make_move(board, move)
+        total += perft(board, -player, depth - 1, variantes)
+        DamasRules.unmake_move(board, undo)
+    return total
+
+
+def perft_bitboard(posicao, player, depth, variantes=False):
+    """perft sobre DamasBitboard: cada lance gera uma posição nova (apply_move), sem desfazer."""
+    if depth == 0:
+        return 1
+    moves = posicao.get_valid_moves(player, variantes)
+    if depth == 1:
+        return len(moves)
+    return sum(perft_bitboard(posicao.apply_move(move), -player, depth - 1, variantes) for move in moves)
+
+
+def bench_bitboard(depth, repeticoes):
+    """DamasBitboard x DamasRules: tempo de geração de lances e de perft nas mesmas posições.
+
+    As folhas do perft precisam coincidir; uma divergência é um erro de regras no bitboard.
+    """
+    print(f"{'posição':<20}{'folhas':>10}{'perft lista (s)':>17}{'perft bits (s)':>16}{'speedup':>9}"
+          f"{'µs lances lista':>17}{'µs lances bits':>16}{'speedup':>9}")
+    totais = [0.0, 0.0]
+    for nome, (board, player) in {**POSICOES, **POSICOES_CAPTURAS}.items():
+        posicao = DamasBitboard.from_board(board)
+
+        inicio = time.perf_counter()
+        folhas = perft([row[:] for row in board], player, depth)
+        tempo_lista = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        folhas_bits = perft_bitboard(posicao, player, depth)
+        tempo_bits = time.perf_counter() - inicio
+        if folhas_bits != folhas:
+            raise RuntimeError(f"{nome}: perft {depth} diverge ({folhas} em DamasRules, {folhas_bits} em bitboard)")
+        totais[0] += tempo_lista
+        totais[1] += tempo_bits
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            DamasRules.get_valid_moves(board, player)
+        geracao_lista = (time.perf_counter() - inicio) / repeticoes * 1e6
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            posicao.get_valid_moves(player)
+        geracao_bits = (time.perf_counter() - inicio) / repeticoes * 1e6
+
+        print(f"{nome:<20}{folhas:>10}{tempo_lista:>17.3f}{tempo_bits:>16.3f}{tempo_lista / tempo_bits:>8.2f}x"
+              f"{geracao_lista:>17.1f}{geracao_bits:>16.1f}{geracao_lista / geracao_bits:>8.2f}x")
+    print(f"{'total':<20}{'':>10}{totais[0]:>17.3f}{totais[1]:>16.3f}{totais[0] / totais[1]:>8.2f}x")
+
+
+def _medir(funcao, memoria, repeticoes=1):
+    """Executa `funcao` cronometrada (melhor de `repeticoes`); com `memoria`, roda
+    mais uma vez sob tracemalloc para obter o pico."""
+    tempo = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        nos = funcao()
+        decorrido = time.perf_counter() - inicio
+        tempo = decorrido if tempo is None else min(tempo, decorrido)
+    resultado = {
+        'nos': nos,
+        'tempo_s': round(tempo, 6),
+        'nos_por_s': round(nos / tempo, 1) if tempo > 0 else None,
+    }
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcao()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        resultado['pico_memoria_bytes'] = pico
+    return resultado
+
+
+def _busca_fixa(board, player, depth):
+    ai = DamasAI(depth=depth, verbose=False)
+    ai.get_best_move(board, player)
+    return ai.nodes_evaluated
+
+
+def bench_suite(perft_depth, perft_posicoes_depth, search_depth, memoria, repeticoes):
+    """Perft e buscas de profundidade fixa em posições curadas; devolve um dicionário serializável."""
+    resultados = {}
+    inicial = DamasRules.criar_tabuleiro()
+    resultados[f'perft/inicial/d{perft_depth}'] = _medir(
+        lambda: perft([row[:] for row in inicial], BRANCO, perft_depth), memoria, repeticoes)
+
+    todas = {**POSICOES, **POSICOES_CAPTURAS}
+    for nome, (board, player) in todas.items():
+        if nome == 'inicial':
+            continue
+        resultados[f'perft/{nome}/d{perft_posicoes_depth}'] = _medir(
+            lambda: perft([row[:] for row in board], player, perft_posicoes_depth), memoria, repeticoes)
+
+    for nome, (board, player) in todas.items():
+        resultados[f'busca/{nome}/d{search_depth}'] = _medir(
+            lambda: _busca_fixa(board, player, search_depth), memoria, repeticoes)
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform(),
+        'repeticoes': repeticoes,
+        'resultados': resultados,
+    }
+
+
+def comparar_suite(atual, base, tolerancia):
+    """Lista os benchmarks cujo nós/s caiu mais que `tolerancia` (fração) ou cuja contagem mudou."""
+    regressoes = []
+    for chave, medida in atual['resultados'].items():
+        anterior = base.get('resultados', {}).get(chave)
+        if anterior is None:
+            continue
+        if chave.startswith('perft/') and medida['nos'] != anterior['nos']:
+            regressoes.append(f"{chave}: perft mudou de {anterior['nos']} para {medida['nos']}")
+        if anterior.get('nos_por_s') and medida.get('nos_por_s'):
+            razao = medida['nos_por_s'] / anterior['nos_por_s']
+            if razao < 1 - tolerancia:
+                regressoes.append(f"{chave}: nós/s {anterior['nos_por_s']:.0f} -> {medida['nos_por_s']:.0f} ({razao:.2f}x)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do motor de Damas.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_suite = sub.add_parser('suite', help="Perft e buscas fixas; resultado em JSON.")
+    p_suite.add_argument('--perft-depth', type=int, default=6)
+    p_suite.add_argument('--perft-posicoes-depth', type=int, default=4)
+    p_suite.add_argument('--depth', type=int, default=6)
+    p_suite.add_argument('--repeticoes', type=int, default=3, help="Cada tempo é o melhor de N execuções.")
+    p_suite.add_argument('--sem-memoria', action='store_true', help="Não mede o pico de memória (mais rápido).")
+    p_suite.add_argument('--saida', help="Arquivo JSON de saída (padrão: stdout).")
+    p_suite.add_argument('--comparar', help="JSON de uma execução anterior para detectar regressões.")
+    p_suite.add_argument('--tolerancia', type=float, default=0.10)
+
+    p_ord = sub.add_parser('ordenacao', help="Nós e tempo com e sem ordenação de lances.")
+    p_ord.add_argument('--depth', type=int, default=6)
+
+    p_pvs = sub.add_parser('pvs', help="Nós com alpha-beta puro, PVS e janelas de aspiração.")
+    p_pvs.add_argument('--depth', type=int, default=6)
+    p_pvs.add_argument('--posicoes', type=int, default=100, help="Posições sorteadas além das de POSICOES.")
+
+    p_sel = sub.add_parser('seletiva', help="LMR, futilidade/razoring e extensões: nós, tempo e lance escolhido.")
+    p_sel.add_argument('--depths', type=int, nargs='+', default=[6, 8])
+    p_sel.add_argument('--referencia', type=int, default=4,
+                       help="Profundidade da busca completa usada como base de tempo.")
+
+    p_cache = sub.add_parser('cache', help="Cache LRU de lances legais: acerto e tempo por capacidade.")
+    p_cache.add_argument('--depth', type=int, default=8)
+    p_cache.add_argument('--capacidades', type=int, nargs='+', default=[1 << 10, 1 << 12, 1 << 14])
+
+    p_perf = sub.add_parser('perfil', help="Estatísticas da busca: cortes, ramificação e tempo por etapa.")
+    p_perf.add_argument('--depth', type=int, default=6)
+
+    p_ter = sub.add_parser('termos', help="Custo dos termos extras da avaliação (termos_avaliacao.py).")
+    p_ter.add_argument('--posicoes', type=int, default=2000)
+    p_ter.add_argument('--depth', type=int, default=5)
+
+    p_par = sub.add_parser('paralelo', help="Speedup da busca paralela na raiz por número de processos.")
+    p_par.add_argument('--depth', type=int, default=7)
+    p_par.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    p_par.add_argument('--tt-tamanho', type=int, default=0,
+                       help="Entradas da TT (0 = sem TT; com TT a busca não se divide e fica serial).")
+
+    p_cap = sub.add_parser('capturas', help="Geração de lances em posições com muitas capturas de dama.")
+    p_cap.add_argument('--repeticoes', type=int, default=500)
+
+    p_var = sub.add_parser('variantes', help="Capturas equivalentes fundidas: ramificação em finais de damas.")
+    p_var.add_argument('--posicoes', type=int, default=200)
+    p_var.add_argument('--depth', type=int, default=4)
+
+    p_mov = sub.add_parser('movimentos', help="Memória e tempo por lance gerado.")
+    p_mov.add_argument('--repeticoes', type=int, default=200)
+
+    p_bit = sub.add_parser('bitboard', help="Perft e geração de lances: DamasBitboard x DamasRules.")
+    p_bit.add_argument('--depth', type=int, default=5)
+    p_bit.add_argument('--repeticoes', type=int, default=500)
+
+    args = parser.parse_args()
+    if args.comando == 'suite':
+        relatorio = bench_suite(args.perft_depth, args.perft_posicoes_depth, args.depth,
+                                 not args.sem_memoria, args.repeticoes)
+        texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+        if args.saida:
+            with open(args.saida, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto + '\n')
+        else:
+            print(texto)
+        if args.comparar:
+            with open(args.comparar, encoding='utf-8') as arquivo:
+                regressoes = comparar_suite(relatorio, json.load(arquivo), args.tolerancia)
+            for linha in regressoes:
+                print(f"REGRESSÃO {linha}", file=sys.stderr)
+            if regressoes:
+                sys.exit(1)
+    elif args.comando == 'ordenacao':
+        bench_ordenacao(args.depth)
+    elif args.comando == 'pvs':
+        bench_pvs(args.depth, args.posicoes)
+    elif args.comando == 'seletiva':
+        bench_seletiva(args.depths, args.referencia)
+    elif args.comando == 'cache':
+        bench_cache_lances(args.depth, args.capacidades)
+    elif args.comando == 'perfil':
+        bench_perfil(args.depth)
+    elif args.comando == 'termos':
+        bench_termos(args.posicoes, args.depth)
+    elif args.comando == 'paralelo':
+        bench_paralelo(args.depth, args.workers, args.tt_tamanho)
+    elif args.comando == 'capturas':
+        bench_capturas(args.repeticoes)
+    elif args.comando == 'variantes':
+        bench_variantes(args.posicoes, args.depth)
+    elif args.comando == 'movimentos':
+        bench_movimentos(args.repeticoes)
+    elif args.comando == 'bitboard':
+        bench_bitboard(args.depth, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
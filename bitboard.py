@@ -0,0 +1,216 @@
+from typing import List, Tuple
+
+from regras import TABULEIRO_TAM, BRANCO, VERMELHO, DAMA_BRANCO, DAMA_VERMELHO, DIRECOES, Movimento
+
+# As 32 casas escuras são numeradas em ordem de linha: sq = r * 4 + c // 2.
+# Essa ordem coincide com a varredura (r, c) de DamasRules, então a geração
+# de movimentos produz exatamente a mesma lista, na mesma ordem.
+NUM_CASAS = 32
+
+SQ_PARA_RC: List[Tuple[int, int]] = []
+RC_PARA_SQ = {}
+for _r in range(TABULEIRO_TAM):
+    for _c in range(TABULEIRO_TAM):
+        if (_r + _c) % 2 == 1:
+            RC_PARA_SQ[(_r, _c)] = len(SQ_PARA_RC)
+            SQ_PARA_RC.append((_r, _c))
+
+# RAIOS[sq][d]: casas percorridas a partir de sq na direção DIRECOES[d].
+RAIOS: List[List[Tuple[int, ...]]] = []
+for _r, _c in SQ_PARA_RC:
+    _raios_sq = []
+    for _dr, _dc in DIRECOES:
+        _raio = []
+        _nr, _nc = _r + _dr, _c + _dc
+        while 0 <= _nr < 8 and 0 <= _nc < 8:
+            _raio.append(RC_PARA_SQ[(_nr, _nc)])
+            _nr, _nc = _nr + _dr, _nc + _dc
+        _raios_sq.append(tuple(_raio))
+    RAIOS.append(_raios_sq)
+
+# Índices em DIRECOES válidos para pedras (somente para frente).
+DIRS_PEDRA = {BRANCO: (2, 3), VERMELHO: (0, 1)}
+
+LINHA_PROMOCAO = {
+    BRANCO: sum(1 << sq for sq, (r, _) in enumerate(SQ_PARA_RC) if r == 7),
+    VERMELHO: sum(1 << sq for sq, (r, _) in enumerate(SQ_PARA_RC) if r == 0),
+}
+
+
+def _casas(mask: int):
+    """Itera os índices dos bits ligados em ordem crescente."""
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length() - 1
+        mask ^= bit
+
+
+class DamasBitboard:
+    """Posição em bitboards: máscaras de 32 bits para brancas, vermelhas e damas.
+
+    Motor alternativo ao tabuleiro List[List[int]] de DamasRules, com a mesma
+    geração de movimentos (lei da maioria, dama voadora, captura para trás).
+    """
+
+    __slots__ = ('brancas', 'vermelhas', 'damas')
+
+    def __init__(self, brancas: int = 0, vermelhas: int = 0, damas: int = 0):
+        self.brancas = brancas
+        self.vermelhas = vermelhas
+        self.damas = damas
+
+    @classmethod
+    def from_board(cls, board: List[List[int]]) -> 'DamasBitboard':
+        brancas = vermelhas = damas = 0
+        for sq, (r, c) in enumerate(SQ_PARA_RC):
+            piece = board[r][c]
+            if piece == 0:
+                continue
+            bit = 1 << sq
+            if piece > 0:
+                brancas |= bit
+            else:
+                vermelhas |= bit
+            if abs(piece) == 2:
+                damas |= bit
+        return cls(brancas, vermelhas, damas)
+
+    def to_board(self) -> List[List[int]]:
+        board = [[0] * 8 for _ in range(8)]
+        for sq in _casas(self.brancas):
+            r, c = SQ_PARA_RC[sq]
+            board[r][c] = DAMA_BRANCO if self.damas >> sq & 1 else BRANCO
+        for sq in _casas(self.vermelhas):
+            r, c = SQ_PARA_RC[sq]
+            board[r][c] = DAMA_VERMELHO if self.damas >> sq & 1 else VERMELHO
+        return board
+
+    def __eq__(self, other):
+        if not isinstance(other, DamasBitboard):
+            return NotImplemented
+        return (self.brancas, self.vermelhas, self.damas) == (other.brancas, other.vermelhas, other.damas)
+
+    def __hash__(self):
+        return hash((self.brancas, self.vermelhas, self.damas))
+
+    def __repr__(self):
+        return f"DamasBitboard(brancas={self.brancas:#010x}, vermelhas={self.vermelhas:#010x}, damas={self.damas:#010x})"
+
+    def get_valid_moves(self, player: int, variantes: bool = False) -> List[Movimento]:
+        if player == BRANCO:
+            own, enemy = self.brancas, self.vermelhas
+        else:
+            own, enemy = self.vermelhas, self.brancas
+        occ = own | enemy
+
+        chains = []
+        for sq in _casas(own):
+            for end, path, captures in self._capture_chains(sq, self.damas >> sq & 1, own, occ, 0):
+                chains.append((sq, end, path, captures))
+
+        if chains:
+            max_captures = max(len(ch[3]) for ch in chains)
+            chains = [ch for ch in chains if len(ch[3]) == max_captures]
+            if not variantes:
+                # Como DamasRules.canonicos: uma captura por (origem, destino, conjunto capturado).
+                vistos = set()
+                unicos = []
+                for ch in chains:
+                    chave = (ch[0], ch[1], sum(1 << x for x in ch[3]))
+                    if chave not in vistos:
+                        vistos.add(chave)
+                        unicos.append(ch)
+                chains = unicos
+            return [
+                Movimento(
+                    SQ_PARA_RC[sq],
+                    SQ_PARA_RC[end],
+                    tuple(SQ_PARA_RC[p] for p in path),
+                    tuple(SQ_PARA_RC[x] for x in captures),
+                )
+                for sq, end, path, captures in chains
+            ]
+
+        moves = []
+        dirs_pedra = DIRS_PEDRA[player]
+        for sq in _casas(own):
+            start = SQ_PARA_RC[sq]
+            if self.damas >> sq & 1:
+                for raio in RAIOS[sq]:
+                    for dest in raio:
+                        if occ >> dest & 1:
+                            break
+                        end = SQ_PARA_RC[dest]
+                        moves.append(Movimento(start, end, (end,), ()))
+            else:
+                raios = RAIOS[sq]
+                for d in dirs_pedra:
+                    raio = raios[d]
+                    if raio and not occ >> raio[0] & 1:
+                        end = SQ_PARA_RC[raio[0]]
+                        moves.append(Movimento(start, end, (end,), ()))
+        return moves
+
+    def _capture_chains(self, sq, is_king, own, occ, captured):
+        """Mesma ordem de DamasRules._iter_capture_moves, sobre máscaras.
+
+        As peças capturadas continuam ocupando suas casas até o fim do lance
+        (e a casa de origem continua ocupada), como no motor de listas.
+        """
+        chains = []
+        for raio in RAIOS[sq]:
+            i = 0
+            n = len(raio)
+            while i < n and not occ >> raio[i] & 1:
+                if not is_king:
+                    i = n
+                    break
+                i += 1
+            if i >= n:
+                continue
+
+            enemy_sq = raio[i]
+            if own >> enemy_sq & 1 or captured >> enemy_sq & 1:
+                continue
+
+            new_captured = captured | (1 << enemy_sq)
+            for j in range(i + 1, n):
+                land = raio[j]
+                if occ >> land & 1:
+                    break
+
+                sub_chains = self._capture_chains(land, is_king, own, occ, new_captured)
+                if sub_chains:
+                    for end, path, captures in sub_chains:
+                        chains.append((end, (land,) + path, (enemy_sq,) + captures))
+                else:
+                    chains.append((land, (land,), (enemy_sq,)))
+
+                if not is_king:
+                    break
+        return chains
+
+    def apply_move(self, move: Movimento) -> 'DamasBitboard':
+        start = RC_PARA_SQ[move.start]
+        end = RC_PARA_SQ[move.end]
+        start_bit, end_bit = 1 << start, 1 << end
+        brancas, vermelhas, damas = self.brancas, self.vermelhas, self.damas
+
+        captured = 0
+        for pos in move.captures:
+            captured |= 1 << RC_PARA_SQ[pos]
+
+        is_king = damas & start_bit
+        if brancas & start_bit:
+            brancas = (brancas ^ start_bit) | end_bit
+            vermelhas &= ~captured
+            promoted = not is_king and end_bit & LINHA_PROMOCAO[BRANCO]
+        else:
+            vermelhas = (vermelhas ^ start_bit) | end_bit
+            brancas &= ~captured
+            promoted = not is_king and end_bit & LINHA_PROMOCAO[VERMELHO]
+
+        damas &= ~(captured | start_bit)
+        if is_king or promoted:
+            damas |= end_bit
+        return DamasBitboard(brancas, vermelhas, damas)
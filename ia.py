@@ -1,10 +1,21 @@
+import json
 import math
-from regras import DamasRules, BRANCO, VERMELHO
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from regras import DamasRules, CacheLances, CACHE_LANCES_PADRAO, BRANCO, VERMELHO, DAMA_BRANCO, DAMA_VERMELHO
+from tablebase import Tablebase, VITORIA, DERROTA
+from termos_avaliacao import TERMOS, avaliar_termos
 
 PESO_PEDRA = 100
 PESO_DAMA = 300
 PESO_MOBILIDADE = 5
 PESO_DEFESA_BASE = 20
+# Termos extras (termos_avaliacao.py), usados só quando ligados em DamasAI(termos=...).
+PESO_BASE_INTACTA = 10
+PESO_PECA_PRESA = 15
+PESO_TEMPO = 2
+PESO_DISTANCIA_DAMA = 3
 
 BOARD_WEIGHTS = [
     [0, 4, 0, 4, 0, 4, 0, 4],
@@ -17,35 +28,719 @@ BOARD_WEIGHTS = [
     [4, 0, 4, 0, 4, 0, 4, 0],
 ]
 
+PESOS_PADRAO = {
+    'pedra': PESO_PEDRA,
+    'dama': PESO_DAMA,
+    'defesa_base': PESO_DEFESA_BASE,
+    'tabuleiro': BOARD_WEIGHTS,
+    'mobilidade': PESO_MOBILIDADE,
+    'base_intacta': PESO_BASE_INTACTA,
+    'presas': PESO_PECA_PRESA,
+    'tempo': PESO_TEMPO,
+    'distancia_dama': PESO_DISTANCIA_DAMA,
+}
+
+EXATO = 0
+LIMITE_INFERIOR = 1
+LIMITE_SUPERIOR = 2
+
+TT_TAMANHO_PADRAO = 1 << 18
+
+PROFUNDIDADE_LIMITE_ID = 32
+SCORE_VITORIA = 10000
+# Vitórias provadas pela tablebase ficam abaixo dos mates vistos na árvore e acima de qualquer avaliação.
+SCORE_TABLEBASE = 9000
+INTERVALO_CHECAGEM_TEMPO = 256
+# De quanto em quanto tempo a busca paralela confere o cancelamento enquanto espera o pool.
+INTERVALO_CHECAGEM_PARALELA_S = 0.05
+# Meia janela inicial do aprofundamento iterativo em torno do score da iteração anterior;
+# a cada falha (acima ou abaixo) ela dobra do lado que falhou.
+JANELA_ASPIRACAO = 50
+
+# Busca seletiva (DamasAI(lmr=..., futilidade=..., extensoes=...)).
+# LMR: lances quietos a partir do LMR_LANCE_MINIMO-ésimo, com depth >= LMR_DEPTH_MINIMA,
+# são buscados um ply mais raso (dois a partir de LMR_LANCE_DOBRO) e rebuscados se passarem de alpha.
+LMR_LANCE_MINIMO = 3
+LMR_LANCE_DOBRO = 8
+LMR_DEPTH_MINIMA = 3
+# Futilidade: a depth 1 e 2, lances quietos são descartados quando a avaliação estática mais a
+# margem não alcança alpha. Razoring: a depth 2 e 3, se nem com a margem chega a alpha, a
+# quiescência decide o nó. Margens em pontos (uma pedra = PESO_PEDRA).
+MARGEM_FUTILIDADE = {1: 120, 2: 250}
+MARGEM_RAZORING = {2: 200, 3: 350}
+# Extensões: resposta única (em geral captura obrigatória) e promoção ganham um ply, até
+# EXTENSAO_MAXIMA plies a mais por caminho (capturas forçadas em série explodiriam a árvore).
+EXTENSAO_MAXIMA = 2
+
+# Prioridades da ordenação de lances (maior primeiro).
+ORDEM_TT = 1 << 30
+ORDEM_CAPTURA = 1 << 21
+ORDEM_PROMOCAO = 1 << 20
+ORDEM_KILLER = 1 << 19
+
+
+def tabela_avaliacao(pesos):
+    """tabela[r][c][piece]: contribuição da peça na casa para evaluate, do ponto de vista das brancas."""
+    tabela = []
+    for r in range(8):
+        linha = []
+        for c in range(8):
+            casa = {}
+            for piece in (BRANCO, DAMA_BRANCO, VERMELHO, DAMA_VERMELHO):
+                val = pesos['dama'] if abs(piece) == 2 else pesos['pedra']
+                val += pesos['tabuleiro'][r][c]
+                if piece == BRANCO and r == 0:
+                    val += pesos['defesa_base']
+                if piece == VERMELHO and r == 7:
+                    val += pesos['defesa_base']
+                casa[piece] = val if piece > 0 else -val
+            linha.append(casa)
+        tabela.append(linha)
+    return tabela
+
+
+def delta_avaliacao(tabela, undo):
+    """Variação da avaliação (brancas) causada pelo lance do registro de make_move."""
+    start_r, start_c, end_r, end_c, piece, promoted, captured = undo
+    delta = tabela[end_r][end_c][piece * 2 if promoted else piece] - tabela[start_r][start_c][piece]
+    for cr, cc, captured_piece in captured:
+        delta -= tabela[cr][cc][captured_piece]
+    return delta
+
+
+def carregar_pesos(caminho):
+    """Lê um arquivo de pesos (JSON com chaves de PESOS_PADRAO)."""
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class BuscaInterrompida(Exception):
+    """Levantada dentro da busca quando o prazo acaba ou a busca é cancelada."""
+
+
+class TabelaTransposicao:
+    """Tabela de transposição de tamanho fixo indexada pelo hash de Zobrist.
+
+    Cada entrada guarda (chave, profundidade, score, tipo de limite, melhor lance,
+    geração). Os scores são sempre do ponto de vista de quem joga na posição.
+    Substituição (também para a mesma posição): casa vazia, profundidade maior
+    ou igual, ou entrada de uma busca anterior (geração antiga).
+    """
+
+    def __init__(self, tamanho=TT_TAMANHO_PADRAO):
+        self.tamanho = tamanho
+        self.entradas = [None] * tamanho
+        self.geracao = 0
+        self.hits = 0
+        self.misses = 0
+        self.colisoes = 0
+        self.gravacoes = 0
+        self.substituicoes = 0
+
+    def nova_busca(self):
+        self.geracao += 1
+
+    def limpar(self):
+        self.entradas = [None] * self.tamanho
+        self.geracao = 0
+
+    def probe(self, chave):
+        entrada = self.entradas[chave % self.tamanho]
+        if entrada is None:
+            self.misses += 1
+            return None
+        if entrada[0] != chave:
+            self.misses += 1
+            self.colisoes += 1
+            return None
+        self.hits += 1
+        return entrada
+
+    def store(self, chave, depth, score, flag, move):
+        idx = chave % self.tamanho
+        antiga = self.entradas[idx]
+        if antiga is not None:
+            # Entrada mais profunda desta busca fica, seja da mesma posição ou de outra.
+            if antiga[1] > depth and antiga[5] == self.geracao:
+                return
+            if antiga[0] != chave:
+                self.substituicoes += 1
+        self.entradas[idx] = (chave, depth, score, flag, move, self.geracao)
+        self.gravacoes += 1
+
+    def estatisticas(self):
+        return {
+            'tamanho': self.tamanho,
+            'hits': self.hits,
+            'misses': self.misses,
+            'colisoes': self.colisoes,
+            'gravacoes': self.gravacoes,
+            'substituicoes': self.substituicoes,
+        }
+
+
+class EstatisticasBusca:
+    """Telemetria de uma chamada a get_best_move (DamasAI.estatisticas).
+
+    Cortes e ramificação contam só os nós do negamax; a quiescência entra em
+    `nos_quiescencia`. Os tempos de geração, ordenação e avaliação só são
+    medidos com DamasAI(perfilar=True), porque cronometrar cada chamada
+    custa caro.
+    """
+
+    CAMPOS_SOMADOS = (
+        'nos_quiescencia', 'nos_expandidos', 'lances_gerados', 'lances_buscados',
+        'cortes_beta', 'cortes_primeiro_lance', 'rebuscas_pvs', 'falhas_aspiracao',
+        'reducoes_lmr', 'podas_futilidade', 'podas_razoring', 'extensoes', 'tempo_geracao', 'tempo_ordenacao', 'tempo_avaliacao',
+    )
+
+    def __init__(self):
+        self.nos_por_ply = [0] * (PROFUNDIDADE_LIMITE_ID + 1)
+        self.nos_quiescencia = 0
+        self.nos_expandidos = 0
+        self.lances_gerados = 0
+        self.lances_buscados = 0
+        self.cortes_beta = 0
+        self.cortes_primeiro_lance = 0
+        # Lances rebuscados com janela inteira depois de a janela nula falhar (PVS).
+        self.rebuscas_pvs = 0
+        # Buscas da raiz repetidas porque o score caiu fora da janela de aspiração.
+        self.falhas_aspiracao = 0
+        # Busca seletiva: lances reduzidos, lances podados por futilidade, nós resolvidos
+        # por razoring e lances estendidos.
+        self.reducoes_lmr = 0
+        self.podas_futilidade = 0
+        self.podas_razoring = 0
+        self.extensoes = 0
+        self.tempo_geracao = 0.0
+        self.tempo_ordenacao = 0.0
+        self.tempo_avaliacao = 0.0
+        self.tempo_total = 0.0
+        self.profundidade = 0
+        self.score = None
+        self.livro = False
+        self.tt = None
+        self.cache_lances = None
+
+    def somar(self, outra):
+        """Acumula os contadores de outra busca (ex.: a de um processo da busca paralela)."""
+        if len(outra.nos_por_ply) > len(self.nos_por_ply):
+            self.nos_por_ply.extend([0] * (len(outra.nos_por_ply) - len(self.nos_por_ply)))
+        for i, n in enumerate(outra.nos_por_ply):
+            self.nos_por_ply[i] += n
+        for campo in self.CAMPOS_SOMADOS:
+            setattr(self, campo, getattr(self, campo) + getattr(outra, campo))
+
+    @property
+    def nos(self):
+        return sum(self.nos_por_ply) + self.nos_quiescencia
+
+    @property
+    def taxa_corte_primeiro_lance(self):
+        return self.cortes_primeiro_lance / self.cortes_beta if self.cortes_beta else 0.0
+
+    @property
+    def ramificacao_media(self):
+        """Lances legais por nó expandido."""
+        return self.lances_gerados / self.nos_expandidos if self.nos_expandidos else 0.0
+
+    @property
+    def ramificacao_efetiva(self):
+        """Lances realmente buscados por nó expandido (depois dos cortes)."""
+        return self.lances_buscados / self.nos_expandidos if self.nos_expandidos else 0.0
+
+    def como_dict(self):
+        nos_por_ply = self.nos_por_ply[:]
+        while nos_por_ply and nos_por_ply[-1] == 0:
+            nos_por_ply.pop()
+        return {
+            'profundidade': self.profundidade,
+            'score': self.score,
+            'livro': self.livro,
+            'nos': self.nos,
+            'nos_por_ply': nos_por_ply,
+            'nos_quiescencia': self.nos_quiescencia,
+            'nos_por_s': round(self.nos / self.tempo_total, 1) if self.tempo_total else 0.0,
+            'cortes_beta': self.cortes_beta,
+            'taxa_corte_primeiro_lance': round(self.taxa_corte_primeiro_lance, 4),
+            'rebuscas_pvs': self.rebuscas_pvs,
+            'falhas_aspiracao': self.falhas_aspiracao,
+            'reducoes_lmr': self.reducoes_lmr,
+            'podas_futilidade': self.podas_futilidade,
+            'podas_razoring': self.podas_razoring,
+            'extensoes': self.extensoes,
+            'ramificacao_media': round(self.ramificacao_media, 2),
+            'ramificacao_efetiva': round(self.ramificacao_efetiva, 2),
+            'tempo_total': round(self.tempo_total, 6),
+            'tempo_geracao': round(self.tempo_geracao, 6),
+            'tempo_ordenacao': round(self.tempo_ordenacao, 6),
+            'tempo_avaliacao': round(self.tempo_avaliacao, 6),
+            'tt': self.tt,
+            'cache_lances': self.cache_lances,
+        }
+
+
+# Estado de cada processo da busca paralela (criado pelo inicializador do pool).
+_ai_trabalhador = None
+_melhor_compartilhado = None
+_busca_trabalhador = None
+
+
+def _inicializar_trabalhador(config, melhor_compartilhado, parar):
+    global _ai_trabalhador, _melhor_compartilhado
+    _ai_trabalhador = DamasAI(verbose=False, **config)
+    # O processo principal liga `parar` quando a busca é cancelada.
+    _ai_trabalhador._stop_event = parar
+    _melhor_compartilhado = melhor_compartilhado
+
+
+def _buscar_lance_raiz(board, player, zobrist, move, index, depth, busca_id):
+    """Busca um lance da raiz num processo do pool.
+
+    A janela vem do melhor score já publicado pelos outros processos. Para lances
+    anteriores ao melhor atual (na ordem da raiz) a janela abre um ponto abaixo,
+    para que empates sejam resolvidos como na busca serial (primeiro lance vence).
+    Devolve (index, score, exato, nós, estatísticas).
+    """
+    global _busca_trabalhador
+    ai = _ai_trabalhador
+    if busca_id != _busca_trabalhador:
+        _busca_trabalhador = busca_id
+        if ai.tt:
+            ai.tt.nova_busca()
+        ai._new_search_ordering()
+    ai.nodes_evaluated = 0
+    ai.estatisticas = EstatisticasBusca()
+    ai.current_depth = depth
+
+    with _melhor_compartilhado.get_lock():
+        best_score, best_index = _melhor_compartilhado[0], _melhor_compartilhado[1]
+    alpha = best_score - 1 if index < best_index else best_score
+
+    # O tabuleiro chegou por pickle: é uma cópia própria deste processo.
+    undo = DamasRules.make_move(board, move)
+    new_hash = DamasRules.zobrist_update(zobrist, undo)
+    score = -ai.negamax(board, depth - 1, -math.inf, -alpha, -player, new_hash)[0]
+    exato = score > alpha
+
+    if exato:
+        with _melhor_compartilhado.get_lock():
+            best_score, best_index = _melhor_compartilhado[0], _melhor_compartilhado[1]
+            if score > best_score or (score == best_score and index < best_index):
+                _melhor_compartilhado[0] = score
+                _melhor_compartilhado[1] = index
+    return index, score, exato, ai.nodes_evaluated, ai.estatisticas
+
+
 class DamasAI:
-    def __init__(self, depth=4):
+    def __init__(self, depth=4, tt_tamanho=TT_TAMANHO_PADRAO, move_ordering=True, verbose=True, workers=1,
+                 tablebase=None, livro=None, pesos=None, verificar_avaliacao=False, perfilar=False, termos=(),
+                 pvs=False, aspiracao=True, lmr=False, futilidade=False, extensoes=False,
+                 cache_lances=CACHE_LANCES_PADRAO):
         self.max_depth = depth
         self.nodes_evaluated = 0
+        self.tt = TabelaTransposicao(tt_tamanho) if tt_tamanho else None
+        # Lances legais dos nós internos, por posição; sobrevive entre buscas (0 desliga).
+        self.cache_lances = CacheLances(cache_lances) if cache_lances else None
+        self.move_ordering = move_ordering
+        # Busca de variação principal (janela nula fora do primeiro lance) e janelas de
+        # aspiração no aprofundamento iterativo; desligadas, a busca é alpha-beta puro.
+        # A PVS fica desligada por padrão: medida em posições de partidas aleatórias, ela não
+        # reduz nós nesta busca (benchmark.py pvs); em profundidade fixa chega a aumentar.
+        self.pvs = pvs
+        self.aspiracao = aspiracao
+        # Busca seletiva: reduções de lances tardios, futilidade/razoring e extensões de
+        # resposta única e promoção. Mudam o resultado da busca; desligadas por padrão.
+        self.lmr = lmr
+        self.futilidade = futilidade
+        self.extensoes = extensoes
+        self.verbose = verbose
+        self.current_depth = 0
+        self._deadline = None
+        self._stop_event = None
+        self._root_move = None
+        self.killers = [[None, None] for _ in range(PROFUNDIDADE_LIMITE_ID + 1)]
+        self.history = {}
+        self.workers = workers
+        self._pool = None
+        self._melhor_compartilhado = None
+        self._parar_compartilhado = None
+        self._busca_id = 0
+        # `pesos` sobrescreve os pesos da avaliação, ex.: {'pedra': 100, 'dama': 320, 'tabuleiro': [[...]]},
+        # ou é o caminho de um arquivo JSON gerado por ajuste_pesos.py.
+        if isinstance(pesos, str):
+            pesos = carregar_pesos(pesos)
+        pesos = dict(pesos or {})
+        desconhecidos = set(pesos) - set(PESOS_PADRAO)
+        if desconhecidos:
+            raise ValueError(f"Pesos desconhecidos: {sorted(desconhecidos)}")
+        self.pesos = {**PESOS_PADRAO, **pesos}
+        # A avaliação das brancas é levada pela busca e atualizada a cada lance com esta tabela.
+        self._tabela_avaliacao = tabela_avaliacao(self.pesos)
+        # Termos extras ligados (nomes de termos_avaliacao.TERMOS); somados nas folhas.
+        self.termos = frozenset(termos)
+        if self.termos - set(TERMOS):
+            raise ValueError(f"Termos desconhecidos: {sorted(self.termos - set(TERMOS))}")
+        # Modo de depuração: confere a avaliação incremental com evaluate em cada folha.
+        self.verificar_avaliacao = verificar_avaliacao
+        # Estatísticas da última busca; com `perfilar`, inclui tempo de geração/ordenação/avaliação.
+        self.estatisticas = EstatisticasBusca()
+        self.perfilar = perfilar
+        self._inscritos = []
+        # `tablebase`: caminho do arquivo gerado por tablebase.py ou um Tablebase já aberto.
+        if isinstance(tablebase, str):
+            tablebase = Tablebase(tablebase)
+        self.tablebase = tablebase
+        # Livro de aberturas (abertura.LivroAberturas), consultado só na raiz.
+        self.livro = livro
+        self._config = {
+            'depth': depth,
+            'tt_tamanho': tt_tamanho,
+            'move_ordering': move_ordering,
+            'pvs': pvs,
+            'aspiracao': aspiracao,
+            'lmr': lmr,
+            'futilidade': futilidade,
+            'extensoes': extensoes,
+            'cache_lances': cache_lances,
+            'tablebase': tablebase.caminho if tablebase else None,
+            'pesos': self.pesos,
+            'termos': self.termos,
+        }
+
+    def nova_partida(self):
+        """Esquece TT, killers e histórico (buscas seguintes não dependem das anteriores)."""
+        if self.tt:
+            self.tt.limpar()
+        self.history = {}
+        self._new_search_ordering()
+
+    def inscrever(self, callback):
+        """Registra callback(evento, estatisticas), chamado com evento 'iteracao' ao fim de
+        cada iteração do aprofundamento iterativo e 'fim' ao fim de cada get_best_move.
+
+        Roda na thread da busca: deve ser rápido e não pode mexer na interface Tk.
+        """
+        self._inscritos.append(callback)
+
+    def cancelar_inscricao(self, callback):
+        self._inscritos.remove(callback)
+
+    def _notificar(self, evento):
+        for callback in self._inscritos:
+            callback(evento, self.estatisticas)
 
-    def get_best_move(self, board, player):
+    def close(self):
+        """Encerra o pool de processos da busca paralela, se existir."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def get_best_move(self, board, player, time_limit_ms=None, stop_event=None, usar_livro=True):
+        """Melhor lance para `player`.
+
+        Sem `time_limit_ms`, busca na profundidade fixa `max_depth` (dividindo os
+        lances da raiz entre `workers` processos, se houver mais de um e a busca
+        for alpha-beta puro; veja _busca_paralela). Com prazo,
+        faz aprofundamento iterativo (1, 2, 3...) e devolve o lance da última
+        iteração completa quando o tempo acaba.
+
+        `stop_event` (threading.Event) permite cancelar a busca de outra thread:
+        a busca serial devolve o melhor lance já completo, ou None.
+
+        Posições do livro de aberturas são respondidas sem busca, a menos que
+        `usar_livro` seja False.
+
+        A telemetria da busca fica em `self.estatisticas` (EstatisticasBusca).
+        """
         self.nodes_evaluated = 0
-        _, best_move = self.minimax(board, self.max_depth, True, -math.inf, math.inf, player)
-        print(f"IA analisou {self.nodes_evaluated} posições.")
+        self.estatisticas = estatisticas = EstatisticasBusca()
+        inicio = time.perf_counter()
+        if usar_livro and self.livro is not None:
+            move = self.livro.escolher(board, player)
+            if move is not None:
+                estatisticas.livro = True
+                estatisticas.tempo_total = time.perf_counter() - inicio
+                self._notificar('fim')
+                if self.verbose:
+                    print("IA jogou lance do livro de aberturas.")
+                return move
+
+        tt_antes = self.tt.estatisticas() if self.tt else None
+        cache_antes = self.cache_lances.estatisticas() if self.cache_lances is not None else None
+
+        if self.tt:
+            self.tt.nova_busca()
+        self._new_search_ordering()
+        zobrist = DamasRules.zobrist_hash(board, player)
+        # A busca faz make/unmake num único tabuleiro mutável; o do chamador fica intacto.
+        board = [row[:] for row in board]
+
+        self._stop_event = stop_event
+        try:
+            if time_limit_ms is None and self._busca_paralela():
+                best_move = self.parallel_root_search(board, player, zobrist)
+            elif time_limit_ms is None:
+                self.current_depth = self.max_depth
+                self._root_move = None
+                estatisticas.score, best_move = self.negamax(
+                    board, self.max_depth, -math.inf, math.inf, player, zobrist)
+                estatisticas.profundidade = self.max_depth
+            else:
+                best_move = self.iterative_deepening(board, player, zobrist, time_limit_ms)
+        except BuscaInterrompida:
+            best_move = None
+        finally:
+            self._stop_event = None
+
+        estatisticas.tempo_total = time.perf_counter() - inicio
+        if self.tt:
+            depois = self.tt.estatisticas()
+            estatisticas.tt = {k: depois[k] - tt_antes[k] for k in ('hits', 'misses', 'colisoes', 'gravacoes')}
+        if self.cache_lances is not None:
+            depois = self.cache_lances.estatisticas()
+            estatisticas.cache_lances = {k: depois[k] - cache_antes[k] for k in ('hits', 'misses')}
+        self._notificar('fim')
+        if self.verbose:
+            print(f"IA analisou {self.nodes_evaluated} posições.")
         return best_move
 
+    def variacao_principal(self, board, player, primeiro_lance, max_plies=PROFUNDIDADE_LIMITE_ID):
+        """Linha esperada a partir de `primeiro_lance`, seguindo os melhores lances guardados na TT.
+
+        A TT pode ter sido sobrescrita, então a linha pode sair mais curta que a
+        profundidade buscada; cada lance é conferido contra os lances legais.
+        """
+        if primeiro_lance is None:
+            return []
+        board = [row[:] for row in board]
+        linha = [primeiro_lance]
+        DamasRules.make_move(board, primeiro_lance)
+        player = -player
+        vistas = set()
+        while self.tt and len(linha) < max_plies:
+            zobrist = DamasRules.zobrist_hash(board, player)
+            if zobrist in vistas:
+                break
+            vistas.add(zobrist)
+            entrada = self.tt.probe(zobrist)
+            if entrada is None or entrada[4] is None:
+                break
+            move = entrada[4]
+            if move not in DamasRules.get_valid_moves(board, player):
+                break
+            linha.append(move)
+            DamasRules.make_move(board, move)
+            player = -player
+        return linha
+
+    def iterative_deepening(self, board, player, zobrist, time_limit_ms, max_depth=PROFUNDIDADE_LIMITE_ID):
+        """Profundidades 1, 2, ... até `max_depth` ou até o prazo (`time_limit_ms`, se houver).
+
+        Cada iteração abre com o lance e a janela de aspiração da anterior.
+        """
+        if time_limit_ms is not None and len(DamasRules.get_valid_moves(board, player)) <= 1:
+            # Lance forçado (ou nenhum) com prazo: uma iteração rasa basta para registrar score e
+            # profundidade. Sem prazo, quem pediu `max_depth` recebe o score dessa profundidade.
+            max_depth = 1
+
+        best_move = None
+        score = None
+        self._root_move = None
+        self._deadline = None
+        inicio = time.perf_counter()
+        try:
+            for depth in range(1, max_depth + 1):
+                self.current_depth = depth
+                score, move = self.busca_aspiracao(board, depth, player, zobrist, score)
+                best_move = move
+                self.estatisticas.profundidade = depth
+                self.estatisticas.score = score
+                self._notificar('iteracao')
+                # O lance da iteração anterior abre a próxima (variação principal).
+                self._root_move = move
+                if abs(score) >= SCORE_VITORIA - PROFUNDIDADE_LIMITE_ID:
+                    break
+                # A primeira iteração sempre termina; o prazo vale a partir da segunda.
+                if time_limit_ms is not None:
+                    self._deadline = inicio + time_limit_ms / 1000.0
+                    if time.perf_counter() >= self._deadline:
+                        break
+        except BuscaInterrompida:
+            pass
+        finally:
+            self._deadline = None
+            self._root_move = None
+        return best_move
+
+    def _busca_paralela(self):
+        """Se get_best_move pode dividir a raiz entre processos sem mudar o lance escolhido.
+
+        Só vale para alpha-beta puro: com TT cada processo teria a sua (e entradas mais
+        profundas mudam scores), e LMR/futilidade dependem da ordem dos lances e da janela,
+        que não são as mesmas nos processos. Nesses casos a busca é serial.
+        """
+        return self.workers > 1 and self.tt is None and not self.lmr and not self.futilidade
+
+    def parallel_root_search(self, board, player, zobrist):
+        """Divide os lances da raiz entre processos (young brothers wait na raiz).
+
+        O primeiro lance é buscado aqui com janela cheia; os demais vão para o
+        pool e compartilham o melhor score encontrado até o momento. Empates são
+        desfeitos pela ordem da raiz, e o lance escolhido é o mesmo da busca
+        serial (nas condições de _busca_paralela). O stop_event da busca é
+        repassado aos processos.
+        """
+        depth = self.max_depth
+        self.current_depth = depth
+        valid_moves = DamasRules.get_valid_moves(board, player)
+        if len(valid_moves) <= 1:
+            # Lance forçado (ou nenhum): nada a dividir; a busca serial dá o score.
+            self.estatisticas.score, move = self.negamax(board, depth, -math.inf, math.inf, player, zobrist)
+            self.estatisticas.profundidade = depth
+            return move
+
+        self.estatisticas.nos_por_ply[0] += 1
+        tt_move = None
+        if self.tt:
+            entrada = self.tt.probe(zobrist)
+            if entrada is not None:
+                tt_move = entrada[4]
+        moves = self.order_moves(board, valid_moves, tt_move, 0)
+
+        undo = DamasRules.make_move(board, moves[0])
+        best_score = -self.negamax(board, depth - 1, -math.inf, math.inf, -player,
+                                   DamasRules.zobrist_update(zobrist, undo))[0]
+        DamasRules.unmake_move(board, undo)
+        best_index = 0
+
+        pool = self._get_pool()
+        with self._melhor_compartilhado.get_lock():
+            self._melhor_compartilhado[0] = best_score
+            self._melhor_compartilhado[1] = best_index
+        self._parar_compartilhado.clear()
+        self._busca_id += 1
+
+        futures = [
+            pool.submit(_buscar_lance_raiz, board, player, zobrist, move, index, depth, self._busca_id)
+            for index, move in enumerate(moves) if index > 0
+        ]
+        pendentes = set(futures)
+        try:
+            while pendentes:
+                prontos, pendentes = wait(pendentes, timeout=INTERVALO_CHECAGEM_PARALELA_S)
+                self._check_deadline()
+                for future in prontos:
+                    index, score, exato, nodes, estatisticas = future.result()
+                    self.nodes_evaluated += nodes
+                    self.estatisticas.somar(estatisticas)
+                    if exato and (score > best_score or (score == best_score and index < best_index)):
+                        best_score, best_index = score, index
+        except BuscaInterrompida:
+            # Os processos param no próximo _check_deadline; espera por eles para que
+            # nenhum publique score velho no melhor compartilhado da busca seguinte.
+            self._parar_compartilhado.set()
+            for future in pendentes:
+                future.cancel()
+            wait(futures)
+            raise
+
+        self.estatisticas.profundidade = depth
+        self.estatisticas.score = best_score
+        if self.tt:
+            self.tt.store(zobrist, depth, best_score, EXATO, moves[best_index])
+        return moves[best_index]
+
+    def _get_pool(self):
+        if self._pool is None:
+            contexto = multiprocessing.get_context()
+            self._melhor_compartilhado = contexto.Array('d', 2)
+            self._parar_compartilhado = contexto.Event()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=contexto,
+                initializer=_inicializar_trabalhador,
+                initargs=(self._config, self._melhor_compartilhado, self._parar_compartilhado),
+            )
+        return self._pool
+
+    def _check_deadline(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise BuscaInterrompida()
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise BuscaInterrompida()
+
+    def _new_search_ordering(self):
+        self.killers = [[None, None] for _ in range(PROFUNDIDADE_LIMITE_ID + 1)]
+        # Envelhece o histórico para que buscas antigas não dominem a ordenação.
+        self.history = {k: v // 2 for k, v in self.history.items() if v > 1}
+
+    def order_moves(self, board, moves, tt_move, ply=None):
+        """Ordena: lance da TT/variação principal, capturas maiores e promoções,
+        killer moves do ply e, por fim, a heurística de histórico."""
+        if not self.move_ordering or len(moves) <= 1:
+            return moves
+        killers = self.killers[ply] if ply is not None else (None, None)
+        history = self.history
+
+        def prioridade(move):
+            if move == tt_move:
+                return ORDEM_TT
+            start_r, start_c = move.start
+            piece = board[start_r][start_c]
+            score = len(move.captures) * ORDEM_CAPTURA
+            if abs(piece) == 1 and move.end[0] == (7 if piece > 0 else 0):
+                score += ORDEM_PROMOCAO
+            if score:
+                return score
+            if move == killers[0]:
+                return ORDEM_KILLER
+            if move == killers[1]:
+                return ORDEM_KILLER - 1
+            return min(history.get((move.start, move.end), 0), ORDEM_KILLER - 2)
+
+        return sorted(moves, key=prioridade, reverse=True)
+
+    def _alongar_plies(self, ply):
+        """Estende killers e nós por ply até `ply`: a profundidade (mais extensões) pode passar
+        de PROFUNDIDADE_LIMITE_ID, o tamanho inicial das tabelas."""
+        nos_por_ply = self.estatisticas.nos_por_ply
+        nos_por_ply.extend([0] * (ply + 1 - len(nos_por_ply)))
+        self.killers.extend([None, None] for _ in range(ply + 1 - len(self.killers)))
+
+    def _register_cutoff(self, move, depth, ply):
+        if move.captures or not self.move_ordering:
+            return
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        chave = (move.start, move.end)
+        self.history[chave] = self.history.get(chave, 0) + depth * depth
+
     def evaluate(self, board, player_color):
         score = 0
         my_pieces = 0
         enemy_pieces = 0
+        pesos = self.pesos
+        peso_pedra = pesos['pedra']
+        peso_dama = pesos['dama']
+        peso_defesa_base = pesos['defesa_base']
+        board_weights = pesos['tabuleiro']
         
         for r in range(8):
             for c in range(8):
                 piece = board[r][c]
                 if piece == 0: continue
                 
-                val = PESO_PEDRA
+                val = peso_pedra
                 if abs(piece) == 2:
-                    val = PESO_DAMA
+                    val = peso_dama
                 
-                val += BOARD_WEIGHTS[r][c]
+                val += board_weights[r][c]
 
-                if piece == 1 and r == 0: val += PESO_DEFESA_BASE
-                if piece == -1 and r == 7: val += PESO_DEFESA_BASE
+                if piece == 1 and r == 0: val += peso_defesa_base
+                if piece == -1 and r == 7: val += peso_defesa_base
 
                 if (piece > 0 and player_color == 1) or (piece < 0 and player_color == -1):
                     score += val
@@ -54,67 +749,305 @@ class DamasAI:
                     score -= val
                     enemy_pieces += 1
 
+        if self.termos:
+            score += avaliar_termos(board, self.termos, pesos) * player_color
         return score
 
-    def quiescence(self, board, alpha, beta, player_color):
-        stand_pat = self.evaluate(board, player_color)
+    def _avaliacao_incremental(self, board):
+        """Parte da avaliação (brancas) que a busca mantém lance a lance: material, casas e base."""
+        tabela = self._tabela_avaliacao
+        return sum(tabela[r][c][piece] for r, row in enumerate(board) for c, piece in enumerate(row) if piece)
+
+    def probe_tablebase(self, board, player_color):
+        """Score exato da tablebase para quem joga, ou None se a posição tem peças demais."""
+        if 64 - sum(row.count(0) for row in board) > self.tablebase.max_pecas:
+            return None
+        resultado = self.tablebase.probe(board, player_color)
+        if resultado is None:
+            return None
+        valor, distancia = resultado
+        if valor == VITORIA:
+            return SCORE_TABLEBASE - distancia
+        if valor == DERROTA:
+            return -SCORE_TABLEBASE + distancia
+        return 0
+
+    def quiescence(self, board, alpha, beta, player_color, zobrist=None, avaliacao=None):
+        estatisticas = self.estatisticas
+        estatisticas.nos_quiescencia += 1
+        perfilar = self.perfilar
+        if self.tablebase is not None:
+            if perfilar:
+                t0 = time.perf_counter()
+            tb_score = self.probe_tablebase(board, player_color)
+            if perfilar:
+                estatisticas.tempo_avaliacao += time.perf_counter() - t0
+            if tb_score is not None:
+                return tb_score
+
+        tt_move = None
+        if self.tt:
+            if zobrist is None:
+                zobrist = DamasRules.zobrist_hash(board, player_color)
+            entrada = self.tt.probe(zobrist)
+            if entrada is not None:
+                _, _, tt_score, tt_flag, tt_move, _ = entrada
+                if tt_flag == EXATO:
+                    return tt_score
+                if tt_flag == LIMITE_INFERIOR and tt_score >= beta:
+                    return beta
+                if tt_flag == LIMITE_SUPERIOR and tt_score <= alpha:
+                    return alpha
+
+        if perfilar:
+            t0 = time.perf_counter()
+        if avaliacao is None:
+            avaliacao = self._avaliacao_incremental(board)
+        folha = avaliacao
+        if self.termos:
+            folha += avaliar_termos(board, self.termos, self.pesos)
+        if self.verificar_avaliacao:
+            completa = self.evaluate(board, BRANCO)
+            if completa != folha:
+                raise RuntimeError(f"Avaliação incremental divergiu: {folha} != {completa} em {board}")
+        stand_pat = folha * player_color
+        if perfilar:
+            estatisticas.tempo_avaliacao += time.perf_counter() - t0
         self.nodes_evaluated += 1
+        if self.nodes_evaluated % INTERVALO_CHECAGEM_TEMPO == 0:
+            self._check_deadline()
 
         if stand_pat >= beta:
             return beta
+        alpha_orig = alpha
         if alpha < stand_pat:
             alpha = stand_pat
 
-        all_moves = DamasRules.get_valid_moves(board, player_color)
-        capture_moves = [m for m in all_moves if m['captures']]
+        if perfilar:
+            t0 = time.perf_counter()
+        capture_moves = DamasRules.get_capture_moves(board, player_color)
+        if perfilar:
+            estatisticas.tempo_geracao += time.perf_counter() - t0
 
         if not capture_moves:
             return alpha
+        if perfilar:
+            t0 = time.perf_counter()
+        capture_moves = self.order_moves(board, capture_moves, tt_move)
+        if perfilar:
+            estatisticas.tempo_ordenacao += time.perf_counter() - t0
 
+        best_move = None
         for move in capture_moves:
-            new_board = DamasRules.apply_move(board, move)
-            score = -self.quiescence(new_board, -beta, -alpha, -player_color)
+            undo = DamasRules.make_move(board, move)
+            new_hash = DamasRules.zobrist_update(zobrist, undo) if self.tt else None
+            score = -self.quiescence(board, -beta, -alpha, -player_color, new_hash,
+                                     avaliacao + delta_avaliacao(self._tabela_avaliacao, undo))
+            DamasRules.unmake_move(board, undo)
 
             if score >= beta:
+                if self.tt:
+                    self.tt.store(zobrist, 0, beta, LIMITE_INFERIOR, move)
                 return beta
             if score > alpha:
                 alpha = score
-        
+                best_move = move
+
+        if self.tt:
+            flag = EXATO if alpha > alpha_orig else LIMITE_SUPERIOR
+            self.tt.store(zobrist, 0, alpha, flag, best_move)
         return alpha
 
-    def minimax(self, board, depth, maximizing, alpha, beta, player_color):
+    def negamax(self, board, depth, alpha, beta, player_color, zobrist=None, avaliacao=None, ply=None):
+        """Alpha-beta em forma negamax com busca de variação principal (PVS).
+
+        Devolve (score, melhor lance) do ponto de vista de `player_color`, quem joga.
+        Por padrão todos os lances são buscados com a janela inteira (alpha-beta).
+        Com `pvs`, só o primeiro (o da TT/variação principal, pela ordenação) usa a
+        janela inteira; os demais vão com janela nula (alpha, alpha + 1), só para
+        provar que não são melhores, e são rebuscados com a janela inteira quando
+        a prova falha. Os scores são inteiros, então a janela nula é exata.
+
+        `ply` é a distância até a raiz; sem ela, vale current_depth - depth (sem extensões).
+        """
+        estatisticas = self.estatisticas
+        perfilar = self.perfilar
+        if ply is None:
+            ply = self.current_depth - depth
+
+        # Fora da raiz, posições com poucas peças são resolvidas pela tablebase.
+        if self.tablebase is not None and ply > 0:
+            if perfilar:
+                t0 = time.perf_counter()
+            tb_score = self.probe_tablebase(board, player_color)
+            if perfilar:
+                estatisticas.tempo_avaliacao += time.perf_counter() - t0
+            if tb_score is not None:
+                return tb_score, None
+
         if depth == 0:
-            return self.quiescence(board, alpha, beta, player_color if maximizing else -player_color), None
+            return self.quiescence(board, alpha, beta, player_color, zobrist, avaliacao), None
+
+        # A fronteira (depth 0) é contada em nos_quiescencia.
+        if ply >= len(estatisticas.nos_por_ply) or ply >= len(self.killers):
+            self._alongar_plies(ply)
+        estatisticas.nos_por_ply[ply] += 1
+
+        alpha_orig = alpha
+        tt_move = None
+        if self.tt:
+            if zobrist is None:
+                zobrist = DamasRules.zobrist_hash(board, player_color)
+            entrada = self.tt.probe(zobrist)
+            if entrada is not None:
+                tt_move = entrada[4]
+            if entrada is not None and entrada[1] >= depth:
+                _, _, tt_score, tt_flag, _, _ = entrada
+                if tt_flag == EXATO:
+                    return tt_score, tt_move
+                if tt_flag == LIMITE_INFERIOR:
+                    alpha = max(alpha, tt_score)
+                else:
+                    beta = min(beta, tt_score)
+                if beta <= alpha:
+                    return tt_score, tt_move
 
-        valid_moves = DamasRules.get_valid_moves(board, player_color if maximizing else -player_color)
+        if avaliacao is None:
+            avaliacao = self._avaliacao_incremental(board)
+        tabela = self._tabela_avaliacao
+
+        # Futilidade e razoring só em nós de janela nula (fora da variação principal) e longe
+        # de scores de vitória, onde a margem não faz sentido.
+        limite_futil = None
+        if self.futilidade and ply > 0 and beta - alpha == 1 and abs(alpha) < SCORE_TABLEBASE // 2 \
+                and (depth in MARGEM_FUTILIDADE or depth in MARGEM_RAZORING):
+            estatica = avaliacao
+            if self.termos:
+                estatica += avaliar_termos(board, self.termos, self.pesos)
+            estatica *= player_color
+            if depth in MARGEM_RAZORING and estatica + MARGEM_RAZORING[depth] <= alpha:
+                score = self.quiescence(board, alpha, beta, player_color, zobrist, avaliacao)
+                if score <= alpha:
+                    estatisticas.podas_razoring += 1
+                    return score, None
+            if depth in MARGEM_FUTILIDADE and estatica + MARGEM_FUTILIDADE[depth] <= alpha:
+                limite_futil = estatica + MARGEM_FUTILIDADE[depth]
+
+        if perfilar:
+            t0 = time.perf_counter()
+        if self.cache_lances is not None:
+            valid_moves = self.cache_lances.get_valid_moves(board, player_color)
+        else:
+            valid_moves = DamasRules.get_valid_moves(board, player_color)
+        if perfilar:
+            estatisticas.tempo_geracao += time.perf_counter() - t0
         if not valid_moves:
-            return (-10000 + depth) if maximizing else (10000 - depth), None
+            return -SCORE_VITORIA + depth, None
+        estatisticas.nos_expandidos += 1
+        estatisticas.lances_gerados += len(valid_moves)
 
+        if ply == 0 and self._root_move is not None:
+            tt_move = self._root_move
+        if perfilar:
+            t0 = time.perf_counter()
+        valid_moves = self.order_moves(board, valid_moves, tt_move, ply)
+        if perfilar:
+            estatisticas.tempo_ordenacao += time.perf_counter() - t0
+
+        # Cada caminho ganha no máximo EXTENSAO_MAXIMA plies além da profundidade nominal.
+        pode_estender = self.extensoes and ply + depth < min(self.current_depth + EXTENSAO_MAXIMA,
+                                                             PROFUNDIDADE_LIMITE_ID)
+        resposta_unica = len(valid_moves) == 1
+
+        best_eval = -math.inf
         best_move = None
+        for i, move in enumerate(valid_moves):
+            undo = DamasRules.make_move(board, move)
+            # undo[5]: a pedra foi promovida.
+            quieto = not move.captures and not undo[5]
+            if limite_futil is not None and quieto and i > 0:
+                # O lance podado vale no máximo limite_futil; o score devolvido não pode ficar abaixo disso.
+                DamasRules.unmake_move(board, undo)
+                estatisticas.podas_futilidade += 1
+                best_eval = max(best_eval, limite_futil)
+                continue
+            new_hash = DamasRules.zobrist_update(zobrist, undo) if self.tt else None
+            nova_avaliacao = avaliacao + delta_avaliacao(tabela, undo)
+            new_depth = depth - 1
+            if pode_estender and (resposta_unica or undo[5]):
+                new_depth += 1
+                estatisticas.extensoes += 1
 
-        if maximizing:
-            max_eval = -math.inf
-            for move in valid_moves:
-                new_board = DamasRules.apply_move(board, move)
-                eval_val, _ = self.minimax(new_board, depth - 1, False, alpha, beta, player_color)
-                
-                if eval_val > max_eval:
-                    max_eval = eval_val
-                    best_move = move
-                
-                alpha = max(alpha, eval_val)
-                if beta <= alpha: break
-            return max_eval, best_move
-        
-        else:
-            min_eval = math.inf
-            for move in valid_moves:
-                new_board = DamasRules.apply_move(board, move)
-                eval_val, _ = self.minimax(new_board, depth - 1, True, alpha, beta, player_color)
-                
-                if eval_val < min_eval:
-                    min_eval = eval_val
-                    best_move = move
-                beta = min(beta, eval_val)
-                if beta <= alpha: break
-            return min_eval, best_move
+            reducao = 0
+            if self.lmr and i > 0 and quieto and i >= LMR_LANCE_MINIMO and depth >= LMR_DEPTH_MINIMA:
+                reducao = 2 if i >= LMR_LANCE_DOBRO and depth > LMR_DEPTH_MINIMA else 1
+                estatisticas.reducoes_lmr += 1
+
+            if reducao:
+                # Lance tardio: teste raso com janela nula; só se passar de alpha ele é
+                # buscado na profundidade cheia (com janela nula na PVS, inteira sem ela).
+                eval_val = -self.negamax(board, new_depth - reducao, -alpha - 1, -alpha, -player_color, new_hash,
+                                         nova_avaliacao, ply + 1)[0]
+                if eval_val > alpha:
+                    if self.pvs:
+                        eval_val = -self.negamax(board, new_depth, -alpha - 1, -alpha, -player_color, new_hash,
+                                                 nova_avaliacao, ply + 1)[0]
+                    else:
+                        eval_val = -self.negamax(board, new_depth, -beta, -alpha, -player_color, new_hash,
+                                                 nova_avaliacao, ply + 1)[0]
+            elif i == 0 or not self.pvs:
+                eval_val = -self.negamax(board, new_depth, -beta, -alpha, -player_color, new_hash,
+                                         nova_avaliacao, ply + 1)[0]
+            else:
+                eval_val = -self.negamax(board, new_depth, -alpha - 1, -alpha, -player_color, new_hash,
+                                         nova_avaliacao, ply + 1)[0]
+            if self.pvs and i > 0 and alpha < eval_val < beta:
+                estatisticas.rebuscas_pvs += 1
+                eval_val = -self.negamax(board, new_depth, -beta, -alpha, -player_color, new_hash,
+                                         nova_avaliacao, ply + 1)[0]
+            DamasRules.unmake_move(board, undo)
+
+            if eval_val > best_eval:
+                best_eval = eval_val
+                best_move = move
+            alpha = max(alpha, eval_val)
+            if alpha >= beta:
+                self._register_cutoff(move, depth, ply)
+                estatisticas.cortes_beta += 1
+                if i == 0:
+                    estatisticas.cortes_primeiro_lance += 1
+                break
+
+        estatisticas.lances_buscados += i + 1
+
+        if self.tt:
+            if best_eval <= alpha_orig:
+                flag = LIMITE_SUPERIOR
+            elif best_eval >= beta:
+                flag = LIMITE_INFERIOR
+            else:
+                flag = EXATO
+            self.tt.store(zobrist, depth, best_eval, flag, best_move)
+
+        return best_eval, best_move
+
+    def busca_aspiracao(self, board, depth, player, zobrist, anterior):
+        """Busca da raiz com janela estreita em torno de `anterior` (score da iteração anterior).
+
+        Se o score cai fora da janela, o lado que falhou é alargado (o dobro a
+        cada vez, até o infinito) e a busca é repetida.
+        """
+        if anterior is None or not self.aspiracao:
+            return self.negamax(board, depth, -math.inf, math.inf, player, zobrist)
+        abaixo = acima = JANELA_ASPIRACAO
+        while True:
+            alpha = anterior - abaixo if abaixo is not None else -math.inf
+            beta = anterior + acima if acima is not None else math.inf
+            score, move = self.negamax(board, depth, alpha, beta, player, zobrist)
+            if score <= alpha:
+                abaixo = abaixo * 2 if abaixo < SCORE_VITORIA else None
+            elif score >= beta:
+                acima = acima * 2 if acima < SCORE_VITORIA else None
+            else:
+                return score, move
+            self.estatisticas.falhas_aspiracao += 1
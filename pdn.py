@@ -0,0 +1,355 @@
+"""Registro de partidas em PDN (Portable Draughts Notation).
+
+Casas numeradas de 1 a 32 como no diagrama padrão de 8x8 (visto pelas
+brancas, com a casa 1 no canto das vermelhas): 1 = (7, 6), 4 = (7, 0),
+21 = (2, 7), 24 = (2, 1), 29 = (0, 7), 32 = (0, 1). As brancas começam em 21-32 e as vermelhas (pretas no PDN) em
+1-12. Lance simples "22-18"; captura com cada casa de pouso "27x18x11" (a
+forma curta "27x11" é aceita na leitura quando não é ambígua).
+
+O leitor percorre coleções de qualquer tamanho partida a partida, guardando
+na memória só a partida corrente, e valida cada lance com
+DamasRules.get_valid_moves.
+
+Uso:
+    python pdn.py validar partidas.pdn
+    python pdn.py converter jogos.jsonl --saida jogos.pdn
+"""
+import argparse
+import json
+import re
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from regras import DamasRules, TABULEIRO_TAM, BRANCO, VERMELHO, Movimento
+
+# GameType 26: damas brasileiras (8x8, captura para trás, dama voadora, lei da maioria).
+TIPO_JOGO = '26'
+
+CASA_PARA_RC: Dict[int, Tuple[int, int]] = {}
+RC_PARA_CASA: Dict[Tuple[int, int], int] = {}
+# Linhas de cima para baixo (vermelhas no alto) e, em cada linha, colunas da direita para a esquerda.
+for _r in range(TABULEIRO_TAM - 1, -1, -1):
+    for _c in range(TABULEIRO_TAM - 1, -1, -1):
+        if (_r + _c) % 2 == 1:
+            _n = len(CASA_PARA_RC) + 1
+            CASA_PARA_RC[_n] = (_r, _c)
+            RC_PARA_CASA[(_r, _c)] = _n
+
+RESULTADOS = {
+    '1-0': BRANCO, '2-0': BRANCO,
+    '0-1': VERMELHO, '0-2': VERMELHO,
+    '1/2-1/2': 0, '1-1': 0,
+    '*': None,
+}
+TEXTO_RESULTADO = {BRANCO: '1-0', VERMELHO: '0-1', 0: '1/2-1/2', None: '*'}
+
+_TAG = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+_TOKEN = re.compile(r'\{[^}]*\}|\(|\)|\$\d+|\d+\.(?:\.\.)?|[0-9]+(?:[-x][0-9]+)+|1/2-1/2|\*|[^\s]+')
+_RESULTADO = re.compile(r'^(?:1-0|0-1|2-0|0-2|1-1|0-0|1/2-1/2|\*)$')
+
+
+class ErroPDN(ValueError):
+    """Texto PDN malformado ou lance ilegal."""
+
+
+class PartidaPDN:
+    """Uma partida: tags, posição inicial, lances (Movimento) e resultado (BRANCO, VERMELHO, 0 ou None)."""
+
+    def __init__(self, tags=None, board=None, player=BRANCO, lances=None, resultado=None):
+        self.tags = dict(tags or {})
+        self.board = board if board is not None else DamasRules.criar_tabuleiro()
+        self.player = player
+        self.lances: List[Movimento] = list(lances or [])
+        self.resultado = resultado
+
+    def posicoes(self) -> Iterator[Tuple[List[List[int]], int, Movimento]]:
+        """Reproduz a partida: gera (tabuleiro, jogador, lance) antes de cada lance."""
+        board = [row[:] for row in self.board]
+        player = self.player
+        for move in self.lances:
+            yield board, player, move
+            board = DamasRules.apply_move(board, move)
+            player = -player
+
+
+def casa(rc) -> int:
+    return RC_PARA_CASA[tuple(rc)]
+
+
+def notacao(move: Movimento) -> str:
+    if move.captures:
+        return 'x'.join(str(casa(p)) for p in (move.start,) + move.path)
+    return f"{casa(move.start)}-{casa(move.end)}"
+
+
+def ler_lance(texto: str, board, player) -> Movimento:
+    """Encontra o lance legal escrito em `texto` ("22-18", "27x18x11" ou "27x11")."""
+    try:
+        casas = [CASA_PARA_RC[int(n)] for n in re.split('[-x]', texto)]
+    except (KeyError, ValueError):
+        raise ErroPDN(f"Lance mal escrito: {texto!r}") from None
+    captura = 'x' in texto
+    candidatos = []
+    # Com todas as variantes: o texto pode trazer qualquer um dos caminhos equivalentes.
+    for move in DamasRules.get_valid_moves(board, player, variantes=True):
+        if move.start != casas[0] or move.end != casas[-1] or bool(move.captures) != captura:
+            continue
+        if len(casas) == 2 or list(move.path) == casas[1:]:
+            candidatos.append(move)
+    if not candidatos:
+        raise ErroPDN(f"Lance ilegal: {texto}")
+    if len(candidatos) > 1 and len({frozenset(m.captures) for m in candidatos}) > 1:
+        raise ErroPDN(f"Lance ambíguo: {texto} (escreva as casas de pouso)")
+    return candidatos[0]
+
+
+def ler_fen(fen: str) -> Tuple[List[List[int]], int]:
+    """'W:W21,22,K30:B1,2' -> (tabuleiro, jogador). Aceita intervalos '1-12'."""
+    partes = fen.strip().rstrip('.').split(':')
+    if not partes or partes[0].upper() not in ('W', 'B'):
+        raise ErroPDN(f"FEN inválida: {fen!r}")
+    player = BRANCO if partes[0].upper() == 'W' else VERMELHO
+    board = [[0] * TABULEIRO_TAM for _ in range(TABULEIRO_TAM)]
+    for parte in partes[1:]:
+        if not parte:
+            continue
+        cor = BRANCO if parte[0].upper() == 'W' else VERMELHO
+        for item in filter(None, parte[1:].split(',')):
+            dama = item[0].upper() == 'K'
+            item = item.lstrip('Kk')
+            inicio, _, fim = item.partition('-')
+            try:
+                numeros = range(int(inicio), int(fim or inicio) + 1)
+                for n in numeros:
+                    r, c = CASA_PARA_RC[n]
+                    board[r][c] = cor * (2 if dama else 1)
+            except (KeyError, ValueError):
+                raise ErroPDN(f"FEN inválida: {fen!r}") from None
+    return board, player
+
+
+def escrever_fen(board, player) -> str:
+    grupos = {BRANCO: [], VERMELHO: []}
+    for n in range(1, 33):
+        r, c = CASA_PARA_RC[n]
+        piece = board[r][c]
+        if piece:
+            cor = BRANCO if piece > 0 else VERMELHO
+            grupos[cor].append(('K' if abs(piece) == 2 else '') + str(n))
+    lado = 'W' if player == BRANCO else 'B'
+    return f"{lado}:W{','.join(grupos[BRANCO])}:B{','.join(grupos[VERMELHO])}"
+
+
+def exportar(partida: PartidaPDN, largura=80) -> str:
+    """Texto PDN da partida (tags, lances numerados e resultado)."""
+    tags = {'Event': '?', 'Site': '?', 'Date': '????.??.??', 'Round': '-', 'White': '?', 'Black': '?'}
+    tags.update(partida.tags)
+    tags['Result'] = TEXTO_RESULTADO[partida.resultado]
+    tags['GameType'] = TIPO_JOGO
+    inicial = DamasRules.criar_tabuleiro()
+    if partida.board != inicial or partida.player != BRANCO:
+        tags['FEN'] = escrever_fen(partida.board, partida.player)
+    linhas = [f'[{nome} "{valor}"]' for nome, valor in tags.items()]
+    linhas.append('')
+
+    tokens = []
+    numero = 1
+    for i, (_, player, move) in enumerate(partida.posicoes()):
+        if player == BRANCO:
+            tokens.append(f"{numero}.")
+        elif i == 0:
+            tokens.append(f"{numero}...")
+        tokens.append(notacao(move))
+        if player == VERMELHO:
+            numero += 1
+    tokens.append(tags['Result'])
+
+    linha = ''
+    for token in tokens:
+        if linha and len(linha) + 1 + len(token) > largura:
+            linhas.append(linha)
+            linha = token
+        else:
+            linha = f"{linha} {token}" if linha else token
+    linhas.append(linha)
+    return '\n'.join(linhas) + '\n'
+
+
+def _montar_partida(tags, tokens, validar, numero):
+    if 'FEN' in tags:
+        board, player = ler_fen(tags['FEN'])
+    else:
+        board, player = DamasRules.criar_tabuleiro(), BRANCO
+    partida = PartidaPDN(tags, [row[:] for row in board], player)
+    resultado = tags.get('Result', '*')
+    nivel = 0
+    for token in tokens:
+        if token == '(':
+            nivel += 1
+            continue
+        if token == ')':
+            nivel -= 1
+            continue
+        if nivel or token.startswith('{') or token.startswith('$') or token.endswith('.'):
+            continue
+        if _RESULTADO.match(token):
+            resultado = token
+            continue
+        if not validar:
+            continue
+        try:
+            move = ler_lance(token, board, player)
+        except ErroPDN as erro:
+            raise ErroPDN(f"Partida {numero}, lance {len(partida.lances) + 1}: {erro}") from None
+        partida.lances.append(move)
+        DamasRules.make_move(board, move)
+        player = -player
+    partida.resultado = RESULTADOS.get(resultado)
+    return partida
+
+
+def ler_partidas(linhas, validar=True, pular_invalidas=False) -> Iterator[PartidaPDN]:
+    """Gera as partidas de um arquivo (ou qualquer iterável de linhas) uma a uma.
+
+    Só a partida corrente fica na memória. Com `validar`, cada lance é
+    conferido contra DamasRules.get_valid_moves e convertido em Movimento;
+    lances ilegais levantam ErroPDN, ou descartam a partida com `pular_invalidas`.
+    """
+    tags = {}
+    tokens = []
+    numero = 0
+    comentario = ''
+
+    def fechar():
+        nonlocal tags, tokens
+        partida = None
+        if tags or tokens:
+            try:
+                partida = _montar_partida(tags, tokens, validar, numero)
+            except ErroPDN:
+                if not pular_invalidas:
+                    raise
+        tags, tokens = {}, []
+        return partida
+
+    for linha in linhas:
+        if comentario:
+            # Comentário { ... } que atravessa linhas.
+            comentario += ' ' + linha
+            if '}' not in linha:
+                continue
+            linha, comentario = comentario, ''
+        texto = linha.strip()
+        if not texto or texto.startswith('%'):
+            continue
+        if texto.startswith('[') and not tokens:
+            for nome, valor in _TAG.findall(texto):
+                tags[nome] = valor
+            continue
+        if texto.startswith('['):
+            # Tags depois de lances sem resultado: começou outra partida.
+            numero += 1
+            partida = fechar()
+            if partida is not None:
+                yield partida
+            for nome, valor in _TAG.findall(texto):
+                tags[nome] = valor
+            continue
+        if texto.count('{') > texto.count('}'):
+            comentario = texto
+            continue
+        for token in _TOKEN.findall(texto):
+            tokens.append(token)
+            if _RESULTADO.match(token):
+                numero += 1
+                partida = fechar()
+                if partida is not None:
+                    yield partida
+                break
+
+    if tags or tokens:
+        numero += 1
+        partida = fechar()
+        if partida is not None:
+            yield partida
+
+
+def partida_do_torneio(registro) -> PartidaPDN:
+    """Converte um registro JSONL de torneio.py (lances como índices) em PartidaPDN."""
+    board = DamasRules.criar_tabuleiro()
+    player = BRANCO
+    lances = []
+    for i in registro['abertura'] + registro['lances']:
+        move = DamasRules.get_valid_moves(board, player)[i]
+        lances.append(move)
+        DamasRules.make_move(board, move)
+        player = -player
+    tags = {'Event': 'torneio.py', 'White': registro['brancas'], 'Black': registro['vermelhas']}
+    return PartidaPDN(tags, lances=lances, resultado=registro['resultado'])
+
+
+# Início de partida na numeração padrão, para conferir casas e leitura/escrita (pdn.py conferir).
+PARTIDA_PADRAO = '[GameType "26"]\n1. 22-18 11-15 2. 18x11 8x15 *'
+ABERTURAS_PADRAO = ('21-17', '22-17', '22-18', '23-18', '23-19', '24-19', '24-20')
+
+
+def conferir_numeracao():
+    """Confere a numeração contra o diagrama padrão: lances iniciais, leitura e reprodução de
+    PARTIDA_PADRAO e ida e volta por exportar. Levanta ErroPDN na primeira diferença."""
+    inicial = DamasRules.criar_tabuleiro()
+    aberturas = tuple(sorted(notacao(m) for m in DamasRules.get_valid_moves(inicial, BRANCO)))
+    if aberturas != ABERTURAS_PADRAO:
+        raise ErroPDN(f"Lances iniciais fora do padrão: {aberturas}")
+    partida = next(ler_partidas(PARTIDA_PADRAO.splitlines()))
+    if [notacao(m) for m in partida.lances] != ['22-18', '11-15', '18x11', '8x15']:
+        raise ErroPDN(f"Partida padrão lida como {[notacao(m) for m in partida.lances]}")
+    relida = next(ler_partidas(exportar(partida).splitlines()))
+    if relida.lances != partida.lances:
+        raise ErroPDN("Partida padrão mudou na ida e volta por exportar")
+    board = inicial
+    for _, _, move in partida.posicoes():
+        board = DamasRules.apply_move(board, move)
+    if board != ler_fen('W:W21,23-32:B1-7,9,10,12,15')[0]:
+        raise ErroPDN(f"Posição final inesperada: {escrever_fen(board, BRANCO)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partidas de Damas em PDN.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_validar = sub.add_parser('validar', help="Lê e valida todas as partidas de um arquivo PDN.")
+    p_validar.add_argument('arquivo')
+    p_validar.add_argument('--pular-invalidas', action='store_true')
+
+    sub.add_parser('conferir', help="Confere a numeração das casas com uma partida padrão.")
+
+    p_conv = sub.add_parser('converter', help="Converte o JSONL do torneio.py em PDN.")
+    p_conv.add_argument('jsonl')
+    p_conv.add_argument('--saida', default='partidas.pdn')
+
+    args = parser.parse_args()
+    if args.comando == 'validar':
+        inicio = time.perf_counter()
+        partidas = lances = 0
+        with open(args.arquivo, encoding='utf-8', errors='replace') as f:
+            for partida in ler_partidas(f, pular_invalidas=args.pular_invalidas):
+                partidas += 1
+                lances += len(partida.lances)
+        decorrido = time.perf_counter() - inicio
+        print(f"{partidas} partidas, {lances} lances válidos em {decorrido:.2f}s "
+              f"({lances / decorrido if decorrido else 0:.0f} lances/s)")
+    elif args.comando == 'conferir':
+        conferir_numeracao()
+        print("Numeração e partida padrão conferidas.")
+    else:
+        with open(args.jsonl, encoding='utf-8') as entrada, open(args.saida, 'w', encoding='utf-8') as saida:
+            for n, linha in enumerate(entrada, 1):
+                if linha.strip():
+                    partida = partida_do_torneio(json.loads(linha))
+                    partida.tags['Round'] = str(n)
+                    saida.write(exportar(partida) + '\n')
+        print(f"Gravado em {args.saida}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,64 @@
 import copy
-from typing import List, Tuple, Optional
+import itertools
+import random
+from collections import OrderedDict
+from typing import List, NamedTuple, Tuple, Optional
 
 TABULEIRO_TAM = 8
 BRANCO = 1
 VERMELHO = -1
 DAMA_BRANCO = 2
 DAMA_VERMELHO = -2
+DIRECOES = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+Casa = Tuple[int, int]
+
+
+class Movimento(NamedTuple):
+    """Lance imutável e hashable (pode ser chave de killers/TT).
+
+    Aceita também o acesso antigo por chave (move['end']) para quem ainda
+    trata lances como dicionários.
+    """
+    start: Casa
+    end: Casa
+    path: Tuple[Casa, ...]
+    captures: Tuple[Casa, ...]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+
+# Construtor direto da tupla: evita o __new__ em Python do NamedTuple no gerador.
+_novo_movimento = tuple.__new__
+
+
+# Chaves de Zobrist: semente fixa para que o hash de uma posição seja o mesmo
+# entre execuções (livros e tabelas gravados em disco dependem disso).
+_zobrist_rng = random.Random(0x0DA4A5)
+ZOBRIST_PECAS = [
+    [{p: _zobrist_rng.getrandbits(64) for p in (BRANCO, DAMA_BRANCO, VERMELHO, DAMA_VERMELHO)}
+     for _ in range(TABULEIRO_TAM)]
+    for _ in range(TABULEIRO_TAM)
+]
+ZOBRIST_VEZ_VERMELHO = _zobrist_rng.getrandbits(64)
+
+# Chave exata de posição (DamasRules.chave_posicao): cada linha vira 2 bytes (as 4 casas
+# escuras em base 5), mais 1 byte da vez. _BYTES_LINHA é indexado pela linha como tupla.
+_BYTES_LINHA = {}
+for _primeira_escura in (0, 1):
+    for _valores in itertools.product((0, BRANCO, DAMA_BRANCO, VERMELHO, DAMA_VERMELHO), repeat=4):
+        _linha = [0] * TABULEIRO_TAM
+        _n = 0
+        for _i, _v in enumerate(_valores):
+            _linha[2 * _i + _primeira_escura] = _v
+            _n = _n * 5 + _v % 5
+        _BYTES_LINHA[tuple(_linha)] = _n.to_bytes(2, 'little')
+_BYTE_VEZ = {BRANCO: b'\x01', VERMELHO: b'\x02'}
+
+CACHE_LANCES_PADRAO = 1 << 12
 
 class DamasRules:
     @staticmethod
@@ -21,45 +74,135 @@ class DamasRules:
         return tab
 
     @staticmethod
-    def get_valid_moves(board: List[List[int]], player: int) -> List[dict]:
+    def zobrist_hash(board: List[List[int]], player: int) -> int:
+        h = ZOBRIST_VEZ_VERMELHO if player == VERMELHO else 0
+        for r in range(TABULEIRO_TAM):
+            for c in range(TABULEIRO_TAM):
+                piece = board[r][c]
+                if piece != 0:
+                    h ^= ZOBRIST_PECAS[r][c][piece]
+        return h
+
+    @staticmethod
+    def chave_posicao(board: List[List[int]], player: int) -> bytes:
+        """Chave imutável e exata (sem colisões, ao contrário do Zobrist) da posição com a vez: 17 bytes."""
+        return b''.join(map(_BYTES_LINHA.__getitem__, map(tuple, board))) + _BYTE_VEZ[player]
+
+    @staticmethod
+    def get_valid_moves(board: List[List[int]], player: int, variantes: bool = False) -> List[Movimento]:
+        """Lances legais de `player`.
+
+        Capturas com a mesma origem, o mesmo destino e o mesmo conjunto de peças
+        capturadas levam à mesma posição: só a primeira (lance canônico) é
+        devolvida. Com `variantes`, vêm todos os caminhos (ex.: para exibição).
+        """
+        moves = DamasRules.get_capture_moves(board, player, variantes)
+        if moves:
+            return moves
+
+        for r in range(TABULEIRO_TAM):
+            for c in range(TABULEIRO_TAM):
+                piece = board[r][c]
+                if piece == 0 or (piece > 0 and player == -1) or (piece < 0 and player == 1):
+                    continue
+                moves.extend(DamasRules._get_simple_moves(board, r, c, piece))
+
+        return moves
+
+    @staticmethod
+    def get_capture_moves(board: List[List[int]], player: int, variantes: bool = False) -> List[Movimento]:
+        """Só as capturas (já filtradas pela lei da maioria); lista vazia se não houver nenhuma.
+
+        Como a captura é obrigatória, quando não é vazia é exatamente get_valid_moves.
+        """
         moves = []
-        has_captures = False
+        # Maior número de capturas visto até agora: sequências menores nem são montadas.
+        max_captures = [1]
 
         for r in range(TABULEIRO_TAM):
             for c in range(TABULEIRO_TAM):
                 piece = board[r][c]
                 if piece == 0 or (piece > 0 and player == -1) or (piece < 0 and player == 1):
                     continue
-                
-                captures = DamasRules._get_capture_moves(board, r, c, piece)
-                moves.extend(captures)
 
-        if moves:
-            max_captures = max(len(m['captures']) for m in moves)
-            moves = [m for m in moves if len(m['captures']) == max_captures]
-            has_captures = True
-
-        if not has_captures:
-            for r in range(TABULEIRO_TAM):
-                for c in range(TABULEIRO_TAM):
-                    piece = board[r][c]
-                    if piece == 0 or (piece > 0 and player == -1) or (piece < 0 and player == 1):
-                        continue
-                    moves.extend(DamasRules._get_simple_moves(board, r, c, piece))
+                if not DamasRules._can_capture_from(board, r, c, piece):
+                    continue
+                for move in DamasRules._iter_capture_moves(board, r, c, piece, max_captures):
+                    if len(move.captures) > max_captures[0]:
+                        max_captures[0] = len(move.captures)
+                        moves = []
+                    moves.append(move)
 
-        return moves
+        if variantes or len(moves) < 2:
+            return moves
+        return DamasRules.canonicos(moves)
+
+    @staticmethod
+    def canonicos(moves: List[Movimento]) -> List[Movimento]:
+        """Remove capturas equivalentes (mesma origem, destino e conjunto capturado), mantendo a primeira."""
+        vistos = set()
+        unicos = []
+        for move in moves:
+            chave = (move.start, move.end, frozenset(move.captures))
+            if chave not in vistos:
+                vistos.add(chave)
+                unicos.append(move)
+        return unicos
+
+    @staticmethod
+    def variantes(board: List[List[int]], player: int, move: Movimento) -> List[Movimento]:
+        """Todos os caminhos de captura equivalentes a `move` (o próprio, se não for captura)."""
+        if not move.captures:
+            return [move]
+        capturadas = frozenset(move.captures)
+        return [
+            m for m in DamasRules.get_capture_moves(board, player, variantes=True)
+            if m.start == move.start and m.end == move.end and frozenset(m.captures) == capturadas
+        ]
+
+    @staticmethod
+    def has_capture(board: List[List[int]], player: int) -> bool:
+        """Se `player` tem alguma captura; para na primeira peça que captura."""
+        for r in range(TABULEIRO_TAM):
+            for c in range(TABULEIRO_TAM):
+                piece = board[r][c]
+                if piece == 0 or (piece > 0 and player == -1) or (piece < 0 and player == 1):
+                    continue
+                if DamasRules._can_capture_from(board, r, c, piece):
+                    return True
+        return False
 
     @staticmethod
-    def _get_simple_moves(board, r, c, piece) -> List[dict]:
+    def has_any_move(board: List[List[int]], player: int) -> bool:
+        """Se `player` tem algum lance (fim de jogo quando não tem), sem montar a lista de lances."""
+        for r in range(TABULEIRO_TAM):
+            for c in range(TABULEIRO_TAM):
+                piece = board[r][c]
+                if piece == 0 or (piece > 0 and player == -1) or (piece < 0 and player == 1):
+                    continue
+                is_king = abs(piece) == 2
+                forward = 1 if piece == BRANCO else -1
+                for dr, dc in DIRECOES:
+                    if not is_king and dr != forward:
+                        continue
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < 8 and 0 <= nc < 8 and board[nr][nc] == 0:
+                        return True
+                if DamasRules._can_capture_from(board, r, c, piece):
+                    return True
+        return False
+
+    @staticmethod
+    def _get_simple_moves(board, r, c, piece) -> List[Movimento]:
         moves = []
+        start = (r, c)
         is_king = abs(piece) == 2
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
         
         if not is_king:
             forward = 1 if piece == BRANCO else -1
-            valid_dirs = [(dr, dc) for dr, dc in directions if dr == forward]
+            valid_dirs = [(dr, dc) for dr, dc in DIRECOES if dr == forward]
         else:
-            valid_dirs = directions
+            valid_dirs = DIRECOES
 
         for dr, dc in valid_dirs:
             dist = 1
@@ -69,12 +212,8 @@ class DamasRules:
                     break
                 
                 if board[nr][nc] == 0:
-                    moves.append({
-                        'start': (r, c),
-                        'end': (nr, nc),
-                        'path': [(nr, nc)],
-                        'captures': []
-                    })
+                    end = (nr, nc)
+                    moves.append(_novo_movimento(Movimento, (start, end, (end,), ())))
                     if not is_king: break
                     dist += 1
                 else:
@@ -82,88 +221,88 @@ class DamasRules:
         return moves
 
     @staticmethod
-    def _get_capture_moves(board, r, c, piece, captured_positions=None) -> List[dict]:
-        if captured_positions is None:
-            captured_positions = set()
+    def _can_capture_from(board, r, c, piece) -> bool:
+        """Teste rápido (sem montar sequências) se a peça em (r, c) tem alguma captura."""
+        is_king = abs(piece) == 2
+        for dr, dc in DIRECOES:
+            er, ec = r + dr, c + dc
+            if is_king:
+                while 0 <= er < 8 and 0 <= ec < 8 and board[er][ec] == 0:
+                    er += dr
+                    ec += dc
+            lr, lc = er + dr, ec + dc
+            if not (0 <= lr < 8 and 0 <= lc < 8):
+                continue
+            piece_at_pos = board[er][ec]
+            if piece_at_pos != 0 and (piece_at_pos > 0) != (piece > 0) and board[lr][lc] == 0:
+                return True
+        return False
+
+    @staticmethod
+    def _iter_capture_moves(board, r, c, piece, max_captures=None):
+        """Gera, sob demanda, as sequências de captura completas da peça em (r, c).
 
-        moves = []
+        Uma única pilha (path/captures/captured) é reaproveitada em toda a busca;
+        só sequências com pelo menos `max_captures[0]` capturas viram lances, já que
+        a lei da maioria descarta as menores. As peças capturadas continuam no
+        tabuleiro até o fim do lance: bloqueiam o caminho e não podem ser
+        capturadas de novo.
+        """
+        if max_captures is None:
+            max_captures = [1]
+
+        start = (r, c)
         is_king = abs(piece) == 2
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        path = []
+        captures = []
+        captured = set()
 
-        for dr, dc in directions:
-            dist_enemy = 1
-            while True:
-                er, ec = r + (dr * dist_enemy), c + (dc * dist_enemy)
-                
+        def expandir(cr, cc):
+            # Devolve (via StopIteration) se havia alguma captura a partir de (cr, cc).
+            continua = False
+            for dr, dc in DIRECOES:
+                er, ec = cr + dr, cc + dc
+                if is_king:
+                    while 0 <= er < 8 and 0 <= ec < 8 and board[er][ec] == 0:
+                        er += dr
+                        ec += dc
                 if not (0 <= er < 8 and 0 <= ec < 8):
-                    break
+                    continue
 
                 piece_at_pos = board[er][ec]
-
-                if piece_at_pos == 0:
-                    if not is_king: break
-                    dist_enemy += 1
+                if piece_at_pos == 0 or (piece_at_pos > 0) == (piece > 0) or (er, ec) in captured:
                     continue
-                
-                if (piece_at_pos > 0 and piece > 0) or (piece_at_pos < 0 and piece < 0):
-                    break
-                
-                if (er, ec) in captured_positions:
-                    break
 
-                dist_land = dist_enemy + 1
-                while True:
-                    lr, lc = r + (dr * dist_land), c + (dc * dist_land)
-                    
-                    if not (0 <= lr < 8 and 0 <= lc < 8):
-                        break
-                    
-                    if board[lr][lc] != 0:
-                        break
-
-                    current_capture = (er, ec)
-                    new_captured = captured_positions | {current_capture}
-                    
-                    board_copy = [row[:] for row in board]
-                    
-                    sub_moves = DamasRules._get_capture_moves(
-                        board, lr, lc, piece, new_captured
-                    )
-
-                    if sub_moves:
-                        for sub in sub_moves:
-                            moves.append({
-                                'start': (r, c),
-                                'end': sub['end'],
-                                'path': [(lr, lc)] + sub['path'],
-                                'captures': [current_capture] + sub['captures']
-                            })
-                    else:
-                        moves.append({
-                            'start': (r, c),
-                            'end': (lr, lc),
-                            'path': [(lr, lc)],
-                            'captures': [current_capture]
-                        })
+                captured.add((er, ec))
+                captures.append((er, ec))
+                lr, lc = er + dr, ec + dc
+                while 0 <= lr < 8 and 0 <= lc < 8 and board[lr][lc] == 0:
+                    continua = True
+                    path.append((lr, lc))
+                    if not (yield from expandir(lr, lc)) and len(captures) >= max_captures[0]:
+                        yield _novo_movimento(Movimento, (start, (lr, lc), tuple(path), tuple(captures)))
+                    path.pop()
 
                     if not is_king: break
-                    dist_land += 1
-                
-                break
+                    lr += dr
+                    lc += dc
+                captures.pop()
+                captured.discard((er, ec))
+            return continua
 
-        return moves
+        yield from expandir(r, c)
 
     @staticmethod
-    def apply_move(board: List[List[int]], move: dict) -> List[List[int]]:
+    def apply_move(board: List[List[int]], move: Movimento) -> List[List[int]]:
         new_board = [row[:] for row in board]
-        start_r, start_c = move['start']
-        end_r, end_c = move['end']
+        start_r, start_c = move.start
+        end_r, end_c = move.end
         piece = new_board[start_r][start_c]
 
         new_board[start_r][start_c] = 0
         new_board[end_r][end_c] = piece
 
-        for cr, cc in move['captures']:
+        for cr, cc in move.captures:
             new_board[cr][cc] = 0
 
         if piece == BRANCO and end_r == 7:
@@ -173,3 +312,102 @@ class DamasRules:
         
         return new_board
         
+
+    @staticmethod
+    def apply_move_hash(board: List[List[int]], move: Movimento, zobrist: int) -> Tuple[List[List[int]], int]:
+        """Aplica o lance e atualiza incrementalmente o hash de Zobrist (inclui a troca de vez)."""
+        new_board = [row[:] for row in board]
+        undo = DamasRules.make_move(new_board, move)
+        return new_board, DamasRules.zobrist_update(zobrist, undo)
+
+    @staticmethod
+    def make_move(board: List[List[int]], move: Movimento) -> tuple:
+        """Aplica o lance no próprio tabuleiro (sem cópia).
+
+        Devolve o registro para unmake_move: (início, fim, peça movida,
+        promoveu, [(linha, coluna, peça capturada), ...]).
+        """
+        start_r, start_c = move.start
+        end_r, end_c = move.end
+        piece = board[start_r][start_c]
+
+        captured = []
+        for cr, cc in move.captures:
+            captured.append((cr, cc, board[cr][cc]))
+            board[cr][cc] = 0
+
+        promoted = (piece == BRANCO and end_r == 7) or (piece == VERMELHO and end_r == 0)
+        board[start_r][start_c] = 0
+        board[end_r][end_c] = piece * 2 if promoted else piece
+
+        return (start_r, start_c, end_r, end_c, piece, promoted, captured)
+
+    @staticmethod
+    def unmake_move(board: List[List[int]], undo: tuple) -> None:
+        start_r, start_c, end_r, end_c, piece, _, captured = undo
+        board[end_r][end_c] = 0
+        board[start_r][start_c] = piece
+        for cr, cc, captured_piece in captured:
+            board[cr][cc] = captured_piece
+
+    @staticmethod
+    def zobrist_update(zobrist: int, undo: tuple) -> int:
+        """Hash da posição depois do lance descrito pelo registro de make_move."""
+        start_r, start_c, end_r, end_c, piece, promoted, captured = undo
+        zobrist ^= ZOBRIST_VEZ_VERMELHO
+        zobrist ^= ZOBRIST_PECAS[start_r][start_c][piece]
+        zobrist ^= ZOBRIST_PECAS[end_r][end_c][piece * 2 if promoted else piece]
+        for cr, cc, captured_piece in captured:
+            zobrist ^= ZOBRIST_PECAS[cr][cc][captured_piece]
+        return zobrist
+
+
+class CacheLances:
+    """Cache LRU de lances legais por posição (DamasRules.chave_posicao), na frente de get_valid_moves.
+
+    Devolve tuplas de Movimento (também imutáveis): a mesma lista pode ser
+    entregue a vários chamadores sem que um deles altere o cache. Não é
+    thread-safe; cada thread (ou DamasAI) deve ter o seu.
+    """
+
+    def __init__(self, capacidade=CACHE_LANCES_PADRAO):
+        self.capacidade = capacidade
+        self._lances = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._lances)
+
+    def get_valid_moves(self, board: List[List[int]], player: int, variantes: bool = False) -> Tuple[Movimento, ...]:
+        chave = DamasRules.chave_posicao(board, player)
+        if variantes:
+            chave += b'v'
+        lances = self._lances.get(chave)
+        if lances is not None:
+            self.hits += 1
+            self._lances.move_to_end(chave)
+            return lances
+        self.misses += 1
+        lances = tuple(DamasRules.get_valid_moves(board, player, variantes))
+        self._lances[chave] = lances
+        if len(self._lances) > self.capacidade:
+            self._lances.popitem(last=False)
+        return lances
+
+    def limpar(self):
+        self._lances.clear()
+
+    @property
+    def taxa_acerto(self):
+        consultas = self.hits + self.misses
+        return self.hits / consultas if consultas else 0.0
+
+    def estatisticas(self):
+        return {
+            'capacidade': self.capacidade,
+            'tamanho': len(self._lances),
+            'hits': self.hits,
+            'misses': self.misses,
+            'taxa_acerto': round(self.taxa_acerto, 4),
+        }
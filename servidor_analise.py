@@ -0,0 +1,326 @@
+"""Servidor local de análise de posições (HTTP/JSON) e cliente de carga.
+
+As análises rodam num pool de processos; cada processo mantém um DamasAI
+aquecido (TT preservada entre pedidos). O servidor limita a fila de pedidos
+pendentes, aplica um tempo máximo por pedido e guarda os resultados recentes
+num cache LRU compartilhado por todos os clientes.
+
+    POST /analisar  {"fen": "W:W21-32:B1-12", "depth": 6}          (ou "tempo_ms": 500)
+                    -> {"lance": "24-20", "score": 12, "pv": ["24-20", ...], ...}
+    GET  /status    -> contadores do servidor
+
+O score é do ponto de vista de quem joga na FEN; a PV (variação principal)
+sai da TT do processo que fez a busca. Sem "tempo_ms" a busca tem
+profundidade fixa e é abortada (504) se passar de "timeout_ms".
+
+Uso:
+    python servidor_analise.py servir --porta 8765 --workers 4
+    python servidor_analise.py carga --pedidos 200 --concorrencia 8
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturoTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from regras import DamasRules, BRANCO
+from ia import DamasAI
+from pdn import ErroPDN, escrever_fen, ler_fen, notacao
+
+PORTA_PADRAO = 8765
+PROFUNDIDADE_PADRAO = 6
+PROFUNDIDADE_MAXIMA = 12
+TEMPO_MAXIMO_MS = 30000
+TIMEOUT_PADRAO_MS = 10000
+FILA_MAXIMA_PADRAO = 64
+CACHE_TAMANHO_PADRAO = 4096
+# Folga para o processo devolver a resposta depois que a busca é interrompida.
+FOLGA_TIMEOUT_S = 2.0
+
+# DamasAI de cada processo do pool (criado pelo inicializador).
+_ai = None
+
+
+def _inicializar_trabalhador(tt_tamanho, tablebase):
+    global _ai
+    _ai = DamasAI(tt_tamanho=tt_tamanho, tablebase=tablebase, verbose=False)
+
+
+def analisar(fen, depth, tempo_ms, prazo):
+    """Roda num processo do pool. A busca é interrompida em `prazo` (time.time()), fixado na chegada do pedido."""
+    restante = prazo - time.time()
+    if restante <= 0:
+        # Esperou na fila do pool além do prazo: nem começa.
+        return {'erro': 'tempo esgotado'}
+    board, player = ler_fen(fen)
+    parar = threading.Event()
+    cronometro = threading.Timer(restante, parar.set)
+    cronometro.start()
+    inicio = time.perf_counter()
+    try:
+        _ai.max_depth = depth
+        move = _ai.get_best_move(board, player, time_limit_ms=tempo_ms, stop_event=parar)
+    finally:
+        cronometro.cancel()
+    if move is None:
+        if parar.is_set():
+            return {'erro': 'tempo esgotado'}
+        return {'lance': None, 'score': None, 'pv': [], 'fim_de_jogo': True}
+
+    estatisticas = _ai.estatisticas
+    return {
+        'lance': notacao(move),
+        'score': estatisticas.score,
+        'pv': [notacao(m) for m in _ai.variacao_principal(board, player, move)],
+        'profundidade': estatisticas.profundidade,
+        'nos': estatisticas.nos,
+        'tempo_s': round(time.perf_counter() - inicio, 4),
+        'interrompida': parar.is_set(),
+    }
+
+
+class ServidorAnalise:
+    """Despacha pedidos para o pool, com fila limitada e cache LRU dos resultados."""
+
+    def __init__(self, workers=None, fila_maxima=FILA_MAXIMA_PADRAO, cache_tamanho=CACHE_TAMANHO_PADRAO,
+                 tt_tamanho=1 << 18, tablebase=None):
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_inicializar_trabalhador, initargs=(tt_tamanho, tablebase))
+        self.vagas = threading.BoundedSemaphore(fila_maxima)
+        self.fila_maxima = fila_maxima
+        self.cache = OrderedDict()
+        self.cache_tamanho = cache_tamanho
+        self.trava = threading.Lock()
+        self.contadores = {'pedidos': 0, 'cache_hits': 0, 'recusados': 0, 'tempo_esgotado': 0, 'erros': 0}
+        self.pendentes = 0
+        self.futuros = set()
+
+    def _contar(self, chave, delta=1):
+        with self.trava:
+            self.contadores[chave] += delta
+
+    def _liberar_vaga(self, futuro):
+        """Chamado quando o processo termina (ou o pedido é cancelado antes de rodar)."""
+        with self.trava:
+            self.pendentes -= 1
+            self.futuros.discard(futuro)
+        self.vagas.release()
+
+    def status(self):
+        with self.trava:
+            return {**self.contadores, 'pendentes': self.pendentes, 'fila_maxima': self.fila_maxima,
+                    'cache': len(self.cache)}
+
+    def analisar(self, pedido):
+        """Devolve (status HTTP, corpo)."""
+        chegada = time.time()
+        self._contar('pedidos')
+        try:
+            board, player = ler_fen(str(pedido['fen']))
+            depth = int(pedido.get('depth', PROFUNDIDADE_PADRAO))
+            tempo_ms = pedido.get('tempo_ms')
+            tempo_ms = int(tempo_ms) if tempo_ms is not None else None
+            timeout_ms = int(pedido.get('timeout_ms', TIMEOUT_PADRAO_MS))
+        except (KeyError, TypeError, ValueError, ErroPDN) as erro:
+            self._contar('erros')
+            return 400, {'erro': f"pedido inválido: {erro}"}
+        if (not 1 <= depth <= PROFUNDIDADE_MAXIMA or not 0 < timeout_ms <= TEMPO_MAXIMO_MS
+                or (tempo_ms is not None and not 0 < tempo_ms <= TEMPO_MAXIMO_MS)):
+            self._contar('erros')
+            return 400, {'erro': f"depth deve estar em 1..{PROFUNDIDADE_MAXIMA}, "
+                                 f"tempo_ms e timeout_ms em 1..{TEMPO_MAXIMO_MS}"}
+
+        # A FEN normalizada identifica a posição no cache, qualquer que seja a grafia do pedido.
+        fen = escrever_fen(board, player)
+        chave = (fen, depth, tempo_ms)
+        with self.trava:
+            if chave in self.cache:
+                self.cache.move_to_end(chave)
+                self.contadores['cache_hits'] += 1
+                return 200, {**self.cache[chave], 'cache': True}
+
+        if not self.vagas.acquire(blocking=False):
+            self._contar('recusados')
+            return 503, {'erro': 'fila cheia'}
+        # O prazo conta desde a chegada, nos dois lados: inclui a espera na fila do pool.
+        prazo = chegada + timeout_ms / 1000.0
+        with self.trava:
+            self.pendentes += 1
+        try:
+            futuro = self.pool.submit(analisar, fen, depth, tempo_ms, prazo)
+        except BaseException:
+            self._liberar_vaga(None)
+            raise
+        with self.trava:
+            self.futuros.add(futuro)
+        # A vaga só volta quando o processo termina: uma busca abandonada aqui ainda
+        # ocupa o pool até parar no prazo, e conta para `fila_maxima`.
+        futuro.add_done_callback(self._liberar_vaga)
+        try:
+            resultado = futuro.result(timeout=max(0.0, prazo - time.time()) + FOLGA_TIMEOUT_S)
+        except FuturoTimeout:
+            futuro.cancel()
+            resultado = {'erro': 'tempo esgotado'}
+
+        if 'erro' in resultado:
+            self._contar('tempo_esgotado')
+            return 504, resultado
+        if not resultado.get('interrompida'):
+            with self.trava:
+                self.cache[chave] = resultado
+                if len(self.cache) > self.cache_tamanho:
+                    self.cache.popitem(last=False)
+        return 200, {**resultado, 'cache': False}
+
+    def close(self):
+        # shutdown(cancel_futures=True) só existe a partir do Python 3.9.
+        with self.trava:
+            pendentes = list(self.futuros)
+        for futuro in pendentes:
+            futuro.cancel()
+        self.pool.shutdown()
+
+
+def _criar_handler(servidor):
+    class Handler(BaseHTTPRequestHandler):
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if self.path == '/status':
+                self._responder(200, servidor.status())
+            else:
+                self._responder(404, {'erro': 'rota desconhecida'})
+
+        def do_POST(self):
+            if self.path != '/analisar':
+                self._responder(404, {'erro': 'rota desconhecida'})
+                return
+            try:
+                tamanho = int(self.headers.get('Content-Length', 0))
+                pedido = json.loads(self.rfile.read(tamanho) or b'{}')
+                if not isinstance(pedido, dict):
+                    raise ValueError("o corpo deve ser um objeto JSON")
+            except ValueError as erro:
+                self._responder(400, {'erro': f"JSON inválido: {erro}"})
+                return
+            self._responder(*servidor.analisar(pedido))
+
+        def log_message(self, formato, *args):
+            pass
+
+    return Handler
+
+
+def servir(porta, workers, fila_maxima, cache_tamanho, tablebase):
+    servidor = ServidorAnalise(workers, fila_maxima, cache_tamanho, tablebase=tablebase)
+    http = ThreadingHTTPServer(('127.0.0.1', porta), _criar_handler(servidor))
+    print(f"Servidor de análise em http://127.0.0.1:{porta} ({workers or os.cpu_count()} processos)")
+    try:
+        http.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http.server_close()
+        servidor.close()
+
+
+def _posicoes_aleatorias(n, seed):
+    """FENs de posições de partidas aleatórias (meio-jogo variado para a carga)."""
+    rng = random.Random(seed)
+    fens = []
+    while len(fens) < n:
+        board, player = DamasRules.criar_tabuleiro(), BRANCO
+        for _ in range(rng.randint(4, 40)):
+            moves = DamasRules.get_valid_moves(board, player)
+            if not moves:
+                break
+            board = DamasRules.apply_move(board, rng.choice(moves))
+            player = -player
+        if DamasRules.has_any_move(board, player):
+            fens.append(escrever_fen(board, player))
+    return fens
+
+
+def pedir(url, pedido, timeout=60):
+    """Envia um pedido ao servidor; devolve (status HTTP, corpo)."""
+    dados = json.dumps(pedido).encode('utf-8')
+    requisicao = urllib.request.Request(url + '/analisar', data=dados, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+            return resposta.status, json.load(resposta)
+    except urllib.error.HTTPError as erro:
+        return erro.code, json.load(erro)
+
+
+def carga(url, pedidos, concorrencia, depth, posicoes, seed):
+    """Dispara `pedidos` análises com `concorrencia` clientes simultâneos e resume latências."""
+    fens = _posicoes_aleatorias(posicoes, seed)
+    rng = random.Random(seed)
+    lote = [{'fen': rng.choice(fens), 'depth': depth} for _ in range(pedidos)]
+
+    def um(pedido):
+        inicio = time.perf_counter()
+        status, corpo = pedir(url, pedido)
+        return status, corpo.get('cache', False), time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as clientes:
+        respostas = list(clientes.map(um, lote))
+    decorrido = time.perf_counter() - inicio
+
+    latencias = sorted(r[2] for r in respostas)
+    por_status = {}
+    for status, _, _ in respostas:
+        por_status[status] = por_status.get(status, 0) + 1
+
+    def percentil(p):
+        return latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000
+
+    print(f"{pedidos} pedidos em {decorrido:.2f}s ({pedidos / decorrido:.1f} pedidos/s), "
+          f"{concorrencia} clientes, depth {depth}, {posicoes} posições distintas")
+    print(f"status: {por_status} | cache: {sum(1 for r in respostas if r[1])} hits")
+    print(f"latência (ms): média {statistics.mean(latencias) * 1000:.1f}, p50 {percentil(0.5):.1f}, "
+          f"p95 {percentil(0.95):.1f}, p99 {percentil(0.99):.1f}, máx {latencias[-1] * 1000:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de análise de Damas (HTTP/JSON).")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_servir = sub.add_parser('servir', help="Inicia o servidor.")
+    p_servir.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    p_servir.add_argument('--workers', type=int, default=os.cpu_count())
+    p_servir.add_argument('--fila', type=int, default=FILA_MAXIMA_PADRAO, help="Pedidos pendentes antes de recusar (503).")
+    p_servir.add_argument('--cache', type=int, default=CACHE_TAMANHO_PADRAO, help="Resultados guardados (LRU).")
+    p_servir.add_argument('--tablebase', help="Arquivo gerado por tablebase.py.")
+
+    p_carga = sub.add_parser('carga', help="Teste de carga contra um servidor em execução.")
+    p_carga.add_argument('--url', default=f'http://127.0.0.1:{PORTA_PADRAO}')
+    p_carga.add_argument('--pedidos', type=int, default=200)
+    p_carga.add_argument('--concorrencia', type=int, default=8)
+    p_carga.add_argument('--depth', type=int, default=5)
+    p_carga.add_argument('--posicoes', type=int, default=50, help="Posições distintas (menos = mais acertos no cache).")
+    p_carga.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    if args.comando == 'servir':
+        servir(args.porta, args.workers, args.fila, args.cache, args.tablebase)
+    else:
+        carga(args.url, args.pedidos, args.concorrencia, args.depth, args.posicoes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Tabelas de finais (tablebases) para posições com poucas peças.
+
+Geração offline por análise retrógrada e consulta via arquivo mapeado em memória.
+
+Uso:
+    python tablebase.py gerar --pecas 3 --saida tablebase.bin
+    python tablebase.py consultar tablebase.bin
+"""
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bitboard import DamasBitboard, SQ_PARA_RC, NUM_CASAS
+from regras import BRANCO, VERMELHO
+
+VITORIA = 1
+EMPATE = 0
+DERROTA = -1
+
+# Um byte por posição (ponto de vista de quem joga):
+# 0 = empate (ou posição impossível), 1..127 = vence em N lances (plies),
+# 128 + N = perde em N plies (N = 0: não tem lances).
+BYTE_DERROTA = 128
+DISTANCIA_MAXIMA = 127
+
+MAGIC = b'DMTB'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sBBH')
+ENTRADA = struct.Struct('<4BQQ')
+
+BINOMIAL = [[0] * (NUM_CASAS + 1) for _ in range(NUM_CASAS + 1)]
+for _n in range(NUM_CASAS + 1):
+    BINOMIAL[_n][0] = 1
+    for _k in range(1, _n + 1):
+        BINOMIAL[_n][_k] = BINOMIAL[_n - 1][_k - 1] + BINOMIAL[_n - 1][_k]
+
+# Pedras nunca ficam na linha de promoção do próprio lado.
+MASCARA_LINHA_7 = sum(1 << sq for sq, (r, _) in enumerate(SQ_PARA_RC) if r == 7)
+MASCARA_LINHA_0 = sum(1 << sq for sq, (r, _) in enumerate(SQ_PARA_RC) if r == 0)
+
+Assinatura = Tuple[int, int, int, int]  # pedras brancas, damas brancas, pedras vermelhas, damas vermelhas
+
+
+def _rank(casas) -> int:
+    """Posição da combinação (casas em ordem crescente) no sistema combinatório."""
+    return sum(BINOMIAL[sq][i + 1] for i, sq in enumerate(casas))
+
+
+def _tamanho(assinatura: Assinatura) -> int:
+    total = 1
+    for k in assinatura:
+        total *= BINOMIAL[NUM_CASAS][k]
+    return total
+
+
+def _indice(assinatura: Assinatura, grupos) -> int:
+    idx = 0
+    for k, casas in zip(assinatura, grupos):
+        idx = idx * BINOMIAL[NUM_CASAS][k] + _rank(casas)
+    return idx
+
+
+def _casas_de(mask: int) -> List[int]:
+    casas = []
+    while mask:
+        bit = mask & -mask
+        casas.append(bit.bit_length() - 1)
+        mask ^= bit
+    return casas
+
+
+def assinatura_e_indice(pos: DamasBitboard) -> Tuple[Assinatura, int]:
+    grupos = (
+        _casas_de(pos.brancas & ~pos.damas),
+        _casas_de(pos.brancas & pos.damas),
+        _casas_de(pos.vermelhas & ~pos.damas),
+        _casas_de(pos.vermelhas & pos.damas),
+    )
+    assinatura = tuple(len(g) for g in grupos)
+    return assinatura, _indice(assinatura, grupos)
+
+
+def assinaturas_ate(max_pecas: int) -> List[Assinatura]:
+    """Assinaturas com 1..max_pecas peças por lado somadas, na ordem em que podem ser resolvidas:
+    capturas levam a menos peças e promoções a menos pedras, então ambas já estão prontas."""
+    todas = []
+    for total in range(2, max_pecas + 1):
+        for assinatura in itertools.product(range(total + 1), repeat=4):
+            wm, wk, rm, rk = assinatura
+            if sum(assinatura) == total and wm + wk > 0 and rm + rk > 0:
+                todas.append(assinatura)
+    todas.sort(key=lambda a: (sum(a), a[0] + a[2], a))
+    return todas
+
+
+def _posicoes(assinatura: Assinatura):
+    """Gera (índice, DamasBitboard) para todas as posições válidas da assinatura."""
+    wm, wk, rm, rk = assinatura
+    casas = range(NUM_CASAS)
+    for g_wm in itertools.combinations(casas, wm):
+        m_wm = sum(1 << sq for sq in g_wm)
+        if m_wm & MASCARA_LINHA_7:
+            continue
+        for g_wk in itertools.combinations(casas, wk):
+            m_wk = sum(1 << sq for sq in g_wk)
+            if m_wk & m_wm:
+                continue
+            for g_rm in itertools.combinations(casas, rm):
+                m_rm = sum(1 << sq for sq in g_rm)
+                if m_rm & (MASCARA_LINHA_0 | m_wm | m_wk):
+                    continue
+                for g_rk in itertools.combinations(casas, rk):
+                    m_rk = sum(1 << sq for sq in g_rk)
+                    if m_rk & (m_wm | m_wk | m_rm):
+                        continue
+                    idx = _indice(assinatura, (g_wm, g_wk, g_rm, g_rk))
+                    yield idx, DamasBitboard(m_wm | m_wk, m_rm | m_rk, m_wk | m_rk)
+
+
+def _codificar(resultado: int, distancia: int) -> int:
+    if resultado == EMPATE:
+        return 0
+    if distancia > DISTANCIA_MAXIMA:
+        raise ValueError(f"Distância {distancia} não cabe em um byte.")
+    return distancia if resultado == VITORIA else BYTE_DERROTA + distancia
+
+
+def _decodificar(byte: int) -> Tuple[int, int]:
+    if byte == 0:
+        return EMPATE, 0
+    if byte >= BYTE_DERROTA:
+        return DERROTA, byte - BYTE_DERROTA
+    return VITORIA, byte
+
+
+def _resolver_assinatura(assinatura: Assinatura, tabelas: Dict[Assinatura, Tuple[bytearray, bytearray]]):
+    """Análise retrógrada de uma assinatura (as duas vezes juntas).
+
+    Lances para outras assinaturas (capturas, promoções) usam as tabelas já
+    prontas; lances dentro da assinatura viram arestas do grafo, resolvido por
+    distância crescente a partir das posições sem lances.
+    """
+    tamanho = _tamanho(assinatura)
+    # Nó = vez * tamanho + índice (vez 0 = brancas, 1 = vermelhas).
+    sucessores = {}
+    vitoria_externa = {}
+    restantes = {}
+    pior = {}
+    tem_empate = set()
+
+    for idx, pos in _posicoes(assinatura):
+        for vez, player in ((0, BRANCO), (1, VERMELHO)):
+            no = vez * tamanho + idx
+            internos = []
+            perdas = []
+            pendentes = 0
+            maior = -1
+            for move in pos.get_valid_moves(player):
+                filho = pos.apply_move(move)
+                if not (filho.brancas if player == VERMELHO else filho.vermelhas):
+                    perdas.append(0)  # o adversário ficou sem peças
+                    continue
+                sig_filho, idx_filho = assinatura_e_indice(filho)
+                if sig_filho == assinatura:
+                    internos.append((1 - vez) * tamanho + idx_filho)
+                    pendentes += 1
+                    continue
+                resultado, distancia = _decodificar(tabelas[sig_filho][1 - vez][idx_filho])
+                if resultado == DERROTA:
+                    perdas.append(distancia)
+                elif resultado == VITORIA:
+                    maior = max(maior, distancia)
+                else:
+                    tem_empate.add(no)
+            sucessores[no] = internos
+            restantes[no] = pendentes
+            pior[no] = maior
+            if perdas:
+                vitoria_externa[no] = min(perdas) + 1
+
+    predecessores = {}
+    for no, internos in sucessores.items():
+        for filho in internos:
+            predecessores.setdefault(filho, []).append(no)
+
+    # Fila por distância: baldes[d] = [(nó, resultado)].
+    baldes = {}
+
+    def agendar(distancia, no, resultado):
+        baldes.setdefault(distancia, []).append((no, resultado))
+
+    for no, distancia in vitoria_externa.items():
+        agendar(distancia, no, VITORIA)
+    for no in sucessores:
+        if restantes[no] == 0 and no not in vitoria_externa and no not in tem_empate:
+            agendar(pior[no] + 1, no, DERROTA)
+
+    valores = {}
+    distancia = 0
+    while baldes:
+        while distancia not in baldes:
+            distancia += 1
+        for no, resultado in baldes.pop(distancia):
+            if no in valores:
+                continue
+            valores[no] = (resultado, distancia)
+            for pai in predecessores.get(no, ()):
+                if pai in valores:
+                    continue
+                if resultado == DERROTA:
+                    agendar(distancia + 1, pai, VITORIA)
+                else:
+                    restantes[pai] -= 1
+                    pior[pai] = max(pior[pai], distancia)
+                    if restantes[pai] == 0 and pai not in vitoria_externa and pai not in tem_empate:
+                        agendar(pior[pai] + 1, pai, DERROTA)
+
+    tabela_brancas = bytearray(tamanho)
+    tabela_vermelhas = bytearray(tamanho)
+    for no, (resultado, dist) in valores.items():
+        vez, idx = divmod(no, tamanho)
+        (tabela_brancas if vez == 0 else tabela_vermelhas)[idx] = _codificar(resultado, dist)
+    tabelas[assinatura] = (tabela_brancas, tabela_vermelhas)
+
+
+def gerar(max_pecas: int, caminho: str, verbose: bool = True) -> None:
+    tabelas = {}
+    assinaturas = assinaturas_ate(max_pecas)
+    for assinatura in assinaturas:
+        inicio = time.perf_counter()
+        _resolver_assinatura(assinatura, tabelas)
+        if verbose:
+            print(f"{assinatura}: {2 * _tamanho(assinatura)} posições em {time.perf_counter() - inicio:.1f}s")
+
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(CABECALHO.pack(MAGIC, VERSAO, max_pecas, len(assinaturas)))
+        offset = CABECALHO.size + ENTRADA.size * len(assinaturas)
+        for assinatura in assinaturas:
+            arquivo.write(ENTRADA.pack(*assinatura, offset, _tamanho(assinatura)))
+            offset += 2 * _tamanho(assinatura)
+        for assinatura in assinaturas:
+            brancas, vermelhas = tabelas[assinatura]
+            arquivo.write(brancas)
+            arquivo.write(vermelhas)
+
+
+class Tablebase:
+    """Consulta a um arquivo gerado por `gerar`, mapeado em memória (somente leitura)."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'rb')
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, versao, self.max_pecas, n_assinaturas = CABECALHO.unpack_from(self._mapa, 0)
+        if magic != MAGIC or versao != VERSAO:
+            self.close()
+            raise ValueError(f"'{caminho}' não é uma tablebase de Damas (versão {VERSAO}).")
+        self._blocos = {}
+        for i in range(n_assinaturas):
+            wm, wk, rm, rk, offset, tamanho = ENTRADA.unpack_from(self._mapa, CABECALHO.size + i * ENTRADA.size)
+            self._blocos[(wm, wk, rm, rk)] = (offset, tamanho)
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        self._mapa.close()
+        self._arquivo.close()
+
+    def probe(self, board, player) -> Optional[Tuple[int, int]]:
+        """(resultado, distância em plies) do ponto de vista de `player`, ou None fora da tabela."""
+        self.probes += 1
+        pos = DamasBitboard.from_board(board)
+        own = pos.brancas if player == BRANCO else pos.vermelhas
+        if not own:
+            return DERROTA, 0
+        assinatura, idx = assinatura_e_indice(pos)
+        bloco = self._blocos.get(assinatura)
+        if bloco is None:
+            return None
+        offset, tamanho = bloco
+        if player == VERMELHO:
+            offset += tamanho
+        self.hits += 1
+        return _decodificar(self._mapa[offset + idx])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tablebases de finais de Damas.")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_gerar = sub.add_parser('gerar', help="Gera as tabelas por análise retrógrada.")
+    p_gerar.add_argument('--pecas', type=int, default=3, help="Número máximo de peças (4 leva horas em Python puro).")
+    p_gerar.add_argument('--saida', default='tablebase.bin')
+
+    p_info = sub.add_parser('consultar', help="Resumo das assinaturas de um arquivo.")
+    p_info.add_argument('arquivo')
+
+    args = parser.parse_args()
+    if args.comando == 'gerar':
+        gerar(args.pecas, args.saida)
+        print(f"Gravado em {args.saida} ({os.path.getsize(args.saida)} bytes).")
+    else:
+        tb = Tablebase(args.arquivo)
+        try:
+            print(f"Até {tb.max_pecas} peças, {len(tb._blocos)} assinaturas.")
+            for assinatura, (offset, tamanho) in sorted(tb._blocos.items()):
+                contagem = {VITORIA: 0, EMPATE: 0, DERROTA: 0}
+                for byte in tb._mapa[offset:offset + 2 * tamanho]:
+                    contagem[_decodificar(byte)[0]] += 1
+                print(f"{assinatura}: vitórias {contagem[VITORIA]}, derrotas {contagem[DERROTA]}, "
+                      f"empates/impossíveis {contagem[EMPATE]}")
+        finally:
+            tb.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Termos extras da avaliação: mobilidade, base intacta, peças presas, tempo e distância das damas.
+
+Calculados sobre máscaras de 32 bits (numeração de bitboard.py) com
+deslocamentos pré-calculados por direção, sem gerar lances: a mobilidade
+conta só passos simples (a dama conta uma casa por direção), o que basta
+como medida de liberdade das peças.
+
+Cada termo é ligado pelo nome em DamasAI(termos=...); o resultado é do ponto
+de vista das brancas, já multiplicado pelos pesos.
+"""
+from typing import Dict, List, Tuple
+
+from regras import TABULEIRO_TAM, BRANCO, VERMELHO
+from bitboard import SQ_PARA_RC, RAIOS, NUM_CASAS, DIRS_PEDRA
+
+TERMOS = ('mobilidade', 'base_intacta', 'presas', 'tempo', 'distancia_dama')
+
+# PASSOS[d]: [(delta, origens, destinos)] — o vizinho de sq na direção d é sq + delta
+# para sq em `origens`; o delta muda com a paridade da linha, daí mais de um par.
+PASSOS: List[List[Tuple[int, int, int]]] = []
+for _d in range(4):
+    _por_delta: Dict[int, int] = {}
+    for _sq in range(NUM_CASAS):
+        if RAIOS[_sq][_d]:
+            _delta = RAIOS[_sq][_d][0] - _sq
+            _por_delta[_delta] = _por_delta.get(_delta, 0) | (1 << _sq)
+    PASSOS.append([
+        (delta, origens, origens << delta if delta > 0 else origens >> -delta)
+        for delta, origens in sorted(_por_delta.items())
+    ])
+
+LINHAS = [sum(1 << sq for sq, (r, _) in enumerate(SQ_PARA_RC) if r == linha) for linha in range(TABULEIRO_TAM)]
+BASE = {BRANCO: LINHAS[0], VERMELHO: LINHAS[TABULEIRO_TAM - 1]}
+TODAS_DIRECOES = (0, 1, 2, 3)
+
+# Distância em lances de dama (diagonais) entre duas casas escuras: max(|dr|, |dc|).
+DISTANCIA = [
+    [max(abs(r1 - r2), abs(c1 - c2)) for r2, c2 in SQ_PARA_RC]
+    for r1, c1 in SQ_PARA_RC
+]
+
+
+def mascaras(board) -> Tuple[int, int, int, int]:
+    """(pedras brancas, damas brancas, pedras vermelhas, damas vermelhas)."""
+    pb = db = pv = dv = 0
+    for sq, (r, c) in enumerate(SQ_PARA_RC):
+        piece = board[r][c]
+        if piece:
+            bit = 1 << sq
+            if piece == 1:
+                pb |= bit
+            elif piece == 2:
+                db |= bit
+            elif piece == -1:
+                pv |= bit
+            else:
+                dv |= bit
+    return pb, db, pv, dv
+
+
+def _contar_bits(mask):
+    """Número de casas ligadas (int.bit_count só existe a partir do Python 3.10)."""
+    return bin(mask).count('1')
+
+
+def _podem_andar(pecas, vazias, direcao):
+    """Peças de `pecas` com a casa vizinha na direção vazia."""
+    resultado = 0
+    for delta, origens, destinos in PASSOS[direcao]:
+        alvo = vazias & destinos
+        resultado |= pecas & (alvo >> delta if delta > 0 else alvo << -delta)
+    return resultado
+
+
+def _lado(pedras, damas, vazias, player):
+    """(lances simples, peças sem nenhum passo livre) de um lado."""
+    lances = 0
+    livres = 0
+    for d in DIRS_PEDRA[player]:
+        m = _podem_andar(pedras, vazias, d)
+        lances += _contar_bits(m)
+        livres |= m
+    if damas:
+        for d in TODAS_DIRECOES:
+            m = _podem_andar(damas, vazias, d)
+            lances += _contar_bits(m)
+            livres |= m
+    presas = _contar_bits((pedras | damas) & ~livres)
+    return lances, presas
+
+
+def _distancia_damas(damas, inimigas):
+    total = 0
+    while damas:
+        bit = damas & -damas
+        sq = bit.bit_length() - 1
+        damas ^= bit
+        linha = DISTANCIA[sq]
+        menor = TABULEIRO_TAM
+        resto = inimigas
+        while resto:
+            b = resto & -resto
+            d = linha[b.bit_length() - 1]
+            if d < menor:
+                menor = d
+            resto ^= b
+        total += menor
+    return total
+
+
+def avaliar_termos(board, termos, pesos) -> int:
+    """Soma ponderada dos termos ligados, do ponto de vista das brancas."""
+    pb, db, pv, dv = mascaras(board)
+    brancas, vermelhas = pb | db, pv | dv
+    vazias = ~(brancas | vermelhas) & ((1 << NUM_CASAS) - 1)
+    score = 0
+
+    if 'mobilidade' in termos or 'presas' in termos:
+        lances_b, presas_b = _lado(pb, db, vazias, BRANCO)
+        lances_v, presas_v = _lado(pv, dv, vazias, VERMELHO)
+        if 'mobilidade' in termos:
+            score += pesos['mobilidade'] * (lances_b - lances_v)
+        if 'presas' in termos:
+            score -= pesos['presas'] * (presas_b - presas_v)
+
+    if 'base_intacta' in termos:
+        # A base só segura a promoção enquanto o adversário não tem dama.
+        base = 0
+        if not dv:
+            base += _contar_bits(pb & BASE[BRANCO])
+        if not db:
+            base -= _contar_bits(pv & BASE[VERMELHO])
+        score += pesos['base_intacta'] * base
+
+    if 'tempo' in termos:
+        avanco = 0
+        for linha in range(1, TABULEIRO_TAM):
+            avanco += linha * (_contar_bits(pb & LINHAS[linha]) - _contar_bits(pv & LINHAS[TABULEIRO_TAM - 1 - linha]))
+        score += pesos['tempo'] * avanco
+
+    if 'distancia_dama' in termos and (db or dv):
+        # Damas perto das peças adversárias pressionam; longe, ficam fora do jogo.
+        score += pesos['distancia_dama'] * (_distancia_damas(dv, brancas) - _distancia_damas(db, vermelhas))
+
+    return score
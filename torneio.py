@@ -0,0 +1,255 @@
+"""Torneio headless entre configurações de DamasAI, em paralelo.
+
+Cada par de motores joga aberturas aleatórias (os primeiros plies sorteados),
+cada abertura duas vezes com as cores trocadas. Os resultados, com os lances
+de cada partida (usados por ajuste_pesos.py), são gravados em JSONL à medida
+que as partidas terminam e, no fim, o placar de cada par sai com a diferença
+de Elo estimada e o intervalo de confiança de 95%.
+
+Uso:
+    python torneio.py --motor base:depth=4 --motor dama350:depth=4,dama=350 --jogos 200 --saida jogos.jsonl
+    python torneio.py --motores motores.json --workers 8
+
+Chaves de --motor: depth, tempo_ms, termos (nomes de termos_avaliacao.TERMOS
+separados por '+', ex.: termos=mobilidade+presas), as opções de busca
+pvs, aspiracao, lmr, futilidade e extensoes (0 ou 1) e os pesos de
+ia.PESOS_PADRAO (exceto 'tabuleiro', que só pode ser passado pelo arquivo de
+--motores).
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from regras import DamasRules, BRANCO, VERMELHO
+from ia import DamasAI, PESOS_PADRAO
+from pdn import exportar, partida_do_torneio
+
+# Limites de empate: total de plies e plies seguidos só com damas, sem captura.
+LIMITE_PLIES = 200
+LIMITE_SEM_PROGRESSO = 40
+REPETICOES_EMPATE = 3
+PLIES_ABERTURA_PADRAO = 4
+Z_95 = 1.96
+
+# Opções liga/desliga da busca aceitas em --motor (ex.: lmr=1,futilidade=1).
+OPCOES_BUSCA = ('pvs', 'aspiracao', 'lmr', 'futilidade', 'extensoes')
+
+# Um DamasAI por configuração em cada processo (a TT é reaproveitada entre partidas).
+_motores = {}
+
+
+def ler_motor(spec):
+    """'nome:depth=4,dama=350' -> {'nome': 'nome', 'depth': 4, 'pesos': {'dama': 350}}."""
+    nome, _, opcoes = spec.partition(':')
+    motor = {'nome': nome, 'pesos': {}}
+    for item in filter(None, opcoes.split(',')):
+        chave, _, valor = item.partition('=')
+        if chave in ('depth', 'tempo_ms'):
+            motor[chave] = int(valor)
+        elif chave == 'termos':
+            motor['termos'] = tuple(filter(None, valor.split('+')))
+        elif chave in OPCOES_BUSCA:
+            motor.setdefault('busca', {})[chave] = bool(int(valor))
+        elif chave in PESOS_PADRAO and chave != 'tabuleiro':
+            motor['pesos'][chave] = int(valor)
+        else:
+            raise ValueError(f"Opção desconhecida em --motor {spec!r}: {chave}")
+    return motor
+
+
+def sortear_abertura(rng, plies):
+    """Lances (índices na lista de lances legais) de uma abertura aleatória que não termina a partida."""
+    while True:
+        board = DamasRules.criar_tabuleiro()
+        player = BRANCO
+        indices = []
+        for _ in range(plies):
+            moves = DamasRules.get_valid_moves(board, player)
+            if not moves:
+                break
+            i = rng.randrange(len(moves))
+            indices.append(i)
+            board = DamasRules.apply_move(board, moves[i])
+            player = -player
+        else:
+            if DamasRules.has_any_move(board, player):
+                return indices
+
+
+def _motor(config):
+    ai = _motores.get(config['nome'])
+    if ai is None:
+        ai = DamasAI(depth=config.get('depth', 4), pesos=config['pesos'], verbose=False,
+                     termos=config.get('termos', ()), **config.get('busca', {}))
+        _motores[config['nome']] = ai
+    return ai
+
+
+def jogar_partida(brancas, vermelhas, abertura, limite_plies=LIMITE_PLIES):
+    """Joga uma partida e devolve o resultado do ponto de vista das brancas (1, 0 ou -1)."""
+    inicio = time.perf_counter()
+    motores = {BRANCO: brancas, VERMELHO: vermelhas}
+    for config in motores.values():
+        _motor(config).nova_partida()
+
+    board = DamasRules.criar_tabuleiro()
+    player = BRANCO
+    for i in abertura:
+        board = DamasRules.apply_move(board, DamasRules.get_valid_moves(board, player)[i])
+        player = -player
+
+    vistas = {}
+    lances = []
+    sem_progresso = 0
+    plies = len(abertura)
+    resultado, motivo = 0, 'limite'
+    while plies < limite_plies:
+        chave = DamasRules.zobrist_hash(board, player)
+        vistas[chave] = vistas.get(chave, 0) + 1
+        if vistas[chave] >= REPETICOES_EMPATE:
+            motivo = 'repeticao'
+            break
+        if sem_progresso >= LIMITE_SEM_PROGRESSO:
+            motivo = 'sem_progresso'
+            break
+
+        config = motores[player]
+        move = _motor(config).get_best_move(board, player, time_limit_ms=config.get('tempo_ms'))
+        if move is None:
+            resultado, motivo = -player, 'sem_lances'
+            break
+        # Índice na lista de lances legais, como na abertura (permite reproduzir a partida).
+        lances.append(DamasRules.get_valid_moves(board, player).index(move))
+
+        piece = board[move.start[0]][move.start[1]]
+        if move.captures or abs(piece) == 1:
+            sem_progresso = 0
+            # Captura e avanço de pedra são irreversíveis: posições anteriores não voltam.
+            vistas.clear()
+        else:
+            sem_progresso += 1
+        board = DamasRules.apply_move(board, move)
+        player = -player
+        plies += 1
+
+    return {
+        'brancas': brancas['nome'],
+        'vermelhas': vermelhas['nome'],
+        'resultado': resultado,
+        'motivo': motivo,
+        'plies': plies,
+        'abertura': abertura,
+        'lances': lances,
+        'segundos': round(time.perf_counter() - inicio, 3),
+    }
+
+
+def elo(pontos, jogos, variancia):
+    """Diferença de Elo e intervalo de 95% a partir da pontuação média por jogo."""
+    def para_elo(s):
+        s = min(max(s, 1e-6), 1 - 1e-6)
+        return -400 * math.log10(1 / s - 1)
+
+    s = pontos / jogos
+    margem = Z_95 * math.sqrt(variancia / jogos)
+    return para_elo(s), para_elo(s - margem), para_elo(s + margem)
+
+
+def placar(resultados, a, b):
+    """Vitórias, empates, derrotas e Elo de `a` contra `b`."""
+    scores = []
+    for r in resultados:
+        if {r['brancas'], r['vermelhas']} != {a, b}:
+            continue
+        sinal = 1 if r['brancas'] == a else -1
+        scores.append((1 + sinal * r['resultado']) / 2)
+    if not scores:
+        return None
+    n = len(scores)
+    media = sum(scores) / n
+    variancia = sum((x - media) ** 2 for x in scores) / n
+    return {
+        'vitorias': scores.count(1.0),
+        'empates': scores.count(0.5),
+        'derrotas': scores.count(0.0),
+        'elo': elo(sum(scores), n, variancia),
+    }
+
+
+def torneio(motores, jogos_por_par, saida, workers=None, plies_abertura=PLIES_ABERTURA_PADRAO, seed=0, pdn=None):
+    rng = random.Random(seed)
+    partidas = []
+    for a, b in itertools.combinations(motores, 2):
+        for _ in range((jogos_por_par + 1) // 2):
+            abertura = sortear_abertura(rng, plies_abertura)
+            partidas.append((a, b, abertura))
+            partidas.append((b, a, abertura))
+
+    resultados = []
+    inicio = time.perf_counter()
+    arquivo_pdn = open(pdn, 'w', encoding='utf-8') if pdn else None
+    with open(saida, 'w', encoding='utf-8') as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [pool.submit(jogar_partida, *p) for p in partidas]
+        for futuro in as_completed(futuros):
+            r = futuro.result()
+            resultados.append(r)
+            f.write(json.dumps(r, ensure_ascii=False) + '\n')
+            f.flush()
+            if arquivo_pdn:
+                partida = partida_do_torneio(r)
+                partida.tags['Round'] = str(len(resultados))
+                arquivo_pdn.write(exportar(partida) + '\n')
+            if len(resultados) % 10 == 0 or len(resultados) == len(partidas):
+                decorrido = time.perf_counter() - inicio
+                print(f"{len(resultados)}/{len(partidas)} partidas ({len(resultados) / decorrido:.2f} partidas/s)")
+
+    if arquivo_pdn:
+        arquivo_pdn.close()
+
+    decorrido = time.perf_counter() - inicio
+    print(f"\n{len(resultados)} partidas em {decorrido:.1f}s ({len(resultados) / decorrido:.2f} partidas/s)")
+    print(f"{'par':<30} {'+':>5} {'=':>5} {'-':>5} {'Elo':>8}  IC 95%")
+    for a, b in itertools.combinations(motores, 2):
+        p = placar(resultados, a['nome'], b['nome'])
+        if p is None:
+            continue
+        diferenca, baixo, alto = p['elo']
+        print(f"{a['nome'] + ' x ' + b['nome']:<30} {p['vitorias']:>5} {p['empates']:>5} {p['derrotas']:>5} "
+              f"{diferenca:>+8.1f}  [{baixo:+.1f}, {alto:+.1f}]")
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Torneio entre configurações da IA de Damas.")
+    parser.add_argument('--motor', action='append', default=[], help="nome:chave=valor,... (repetível)")
+    parser.add_argument('--motores', help="Arquivo JSON com a lista de motores "
+                                          "({'nome', 'depth', 'tempo_ms', 'pesos', 'termos', 'busca'}).")
+    parser.add_argument('--jogos', type=int, default=100, help="Partidas por par de motores (arredondado para par).")
+    parser.add_argument('--plies-abertura', type=int, default=PLIES_ABERTURA_PADRAO)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--saida', default='torneio.jsonl')
+    parser.add_argument('--pdn', help="Grava também as partidas neste arquivo PDN.")
+    args = parser.parse_args()
+
+    motores = [ler_motor(spec) for spec in args.motor]
+    if args.motores:
+        with open(args.motores, encoding='utf-8') as f:
+            for motor in json.load(f):
+                motor.setdefault('pesos', {})
+                motores.append(motor)
+    if len(motores) < 2:
+        parser.error("São necessários pelo menos dois motores.")
+    if len({m['nome'] for m in motores}) != len(motores):
+        parser.error("Os nomes dos motores devem ser distintos.")
+
+    torneio(motores, args.jogos, args.saida, args.workers, args.plies_abertura, args.seed, args.pdn)
+
+
+if __name__ == "__main__":
+    main()
@@ -263,7 +263,7 @@ class VisualizadorMinimax:
             self.is_thinking = False
             self.draw_board()
             
-            if not DamasRules.get_valid_moves(self.board, BRANCO):
+            if not DamasRules.has_any_move(self.board, BRANCO):
                 messagebox.showinfo("Fim de Jogo", "Você perdeu!")
 
     def visual_hook(self, line_number, local_vars, board_state=None):